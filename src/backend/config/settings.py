@@ -8,16 +8,44 @@ FREESOUND_API_KEY = os.getenv("FREESOUND_API_KEY", "")
 CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
 CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
 CHROMA_COLLECTION = "audio_samples"
+# Parallel chunk uploads when talking to a Chroma server over HTTP
+CHROMA_WRITE_CONCURRENCY = int(os.getenv("CHROMA_WRITE_CONCURRENCY", "4"))
+
+# Vector store: "chroma", "local" (in-process exact search over a mmap'd matrix)
+# or "ivf" (local index probing the nearest KMeans clusters)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "2"))
 
 # Backend
 BACKEND_PORT = int(os.getenv("BACKEND_PORT", "8001"))
 MAX_UPLOAD_SIZE_MB = 10
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "100"))
+MAX_BATCH_VECTORS = int(os.getenv("MAX_BATCH_VECTORS", "1000"))
+MAX_RANGE_RESULTS = int(os.getenv("MAX_RANGE_RESULTS", "10000"))
 ALLOWED_EXTENSIONS = [".mp3", ".wav", ".flac"]
 
 # Audio Processing
 SAMPLE_RATE = 22050
 N_MFCC = 13
 N_CHROMA = 12
+# MFCC mean + std, chroma, centroid mean + std, rolloff, ZCR, tempo, RMS, bandwidth
+EMBEDDING_DIM = 2 * N_MFCC + N_CHROMA + 7
+
+# Batch Processing
+N_WORKERS = int(os.getenv("N_WORKERS", "1"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "8"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+EXTRACTION_MAX_PENDING = int(os.getenv("EXTRACTION_MAX_PENDING", "64"))
+RETRY_AFTER_SECONDS = 5
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "3600"))
+BULK_INGEST_BATCH_SIZE = int(os.getenv("BULK_INGEST_BATCH_SIZE", "64"))
+MAX_BULK_UPLOAD_MB = int(os.getenv("MAX_BULK_UPLOAD_MB", "2048"))
+# Bytes one bulk job may unpack from its archives
+MAX_BULK_EXTRACT_MB = int(os.getenv("MAX_BULK_EXTRACT_MB", "4096"))
+WRITE_BUFFER_MAX_ITEMS = int(os.getenv("WRITE_BUFFER_MAX_ITEMS", "256"))
+WRITE_BUFFER_MAX_DELAY = float(os.getenv("WRITE_BUFFER_MAX_DELAY", "1.0"))
 
 # ML Models
 ANOMALY_CONTAMINATION = 0.1
@@ -52,3 +80,19 @@ DATA_DIR = BASE_DIR / "data" / "raw"
 PROCESSED_DIR = BASE_DIR / "data" / "processed"
 MODELS_DIR = BASE_DIR / "models" / "saved"
 CHROMA_DB_DIR = BASE_DIR / "chroma_db"
+FEATURE_CACHE_DIR = BASE_DIR / "data" / "cache" / "features"
+FEATURE_CACHE_MAX_MB = int(os.getenv("FEATURE_CACHE_MAX_MB", "512"))
+LOCAL_INDEX_DIR = BASE_DIR / "local_index"
+STORAGE_DIR = CHROMA_DB_DIR if VECTOR_BACKEND == "chroma" else LOCAL_INDEX_DIR
+MANIFEST_PATH = STORAGE_DIR / "manifest.json"
+STATS_PATH = STORAGE_DIR / "stats.json"
+WRITE_LOG_PATH = STORAGE_DIR / "pending_writes.jsonl"
+CLUSTERER_PATH = MODELS_DIR / "clusterer_kmeans.pkl"
+INGEST_JOBS_DIR = BASE_DIR / "data" / "uploads"
+KNN_GRAPH_PATH = STORAGE_DIR / "knn_graph.npz"
+KNN_GRAPH_K = int(os.getenv("KNN_GRAPH_K", "20"))
+KNN_BLOCK_SIZE = int(os.getenv("KNN_BLOCK_SIZE", "1024"))
+# Sliding-window segment index used by /search/segments
+SEGMENT_INDEX_DIR = STORAGE_DIR / "segments"
+SEGMENT_SECONDS = float(os.getenv("SEGMENT_SECONDS", "2.0"))
+SEGMENT_HOP_SECONDS = float(os.getenv("SEGMENT_HOP_SECONDS", "0.5"))
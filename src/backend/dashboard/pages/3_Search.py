@@ -29,6 +29,11 @@ with tab1:
 
     n_results = st.slider("Number of results", min_value=1, max_value=20, value=5)
 
+    genre_filter = st.selectbox(
+        "Only return genre",
+        ["Any", "techno", "house", "dubstep", "ambient", "drum_and_bass", "trance"],
+    )
+
     if st.button("Search Similar Samples", type="primary"):
         if uploaded_file is None:
             st.warning("Please upload an audio file first")
@@ -37,6 +42,8 @@ with tab1:
                 try:
                     files = {"file": uploaded_file}
                     params = {"n_results": n_results}
+                    if genre_filter != "Any":
+                        params["genre"] = genre_filter
 
                     response = requests.post(
                         f"{API_URL}/search", files=files, params=params, timeout=30
@@ -81,6 +88,41 @@ with tab1:
                 except Exception as e:
                     st.error(f"Error: {e}")
 
+    st.markdown("---")
+    st.markdown("Or find neighbours of a sample already in the database")
+
+    sample_id = st.text_input("Sample ID", key="search_sample_id")
+
+    if st.button("Search by Sample ID"):
+        if not sample_id.strip():
+            st.warning("Please enter a sample ID first")
+        else:
+            try:
+                response = requests.get(
+                    f"{API_URL}/search/by-id/{sample_id.strip()}",
+                    params={"n_results": n_results},
+                    timeout=30,
+                )
+
+                if response.status_code == 200:
+                    data = response.json()
+                    st.success(f"Found {len(data['results'])} similar samples!")
+
+                    for i, result in enumerate(data["results"], 1):
+                        similarity = (1 - result["distance"]) * 100
+                        st.write(
+                            f"#{i} - {result['filename']} ({result['genre']}, "
+                            f"{similarity:.1f}% similar)"
+                        )
+                else:
+                    st.error(f"Error: {response.status_code}")
+                    st.json(response.json())
+
+            except requests.exceptions.ConnectionError:
+                st.error("Cannot connect to API")
+            except Exception as e:
+                st.error(f"Error: {e}")
+
 with tab2:
     st.header("Upload New Sample")
     st.markdown("Add a new audio sample to the database")
@@ -165,7 +207,7 @@ with tab3:
                 if response.status_code == 200:
                     data = response.json()
 
-                    st.success(f"Found {data['total_results']} samples")
+                    st.success(f"Found {data['total_matches']} samples")
 
                     st.subheader("Filters Applied")
                     st.json(data["filters_applied"])
@@ -5,16 +5,17 @@ import json
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.storage.chroma_client import ChromaStorage
+from src.storage.backends import create_storage
+from src.storage.export import load_samples
 from src.models.clustering import AudioClusterer, find_optimal_k, analyze_clusters
 from src.models.dimensionality_reduction import DimensionalityReducer
+from utils.atomic import write_json_atomic
 from config.settings import (
     N_CLUSTERS,
     CLUSTERING_METHOD,
     REDUCTION_METHOD,
     PROCESSED_DIR,
     MODELS_DIR,
-    CHROMA_DB_DIR,
 )
 
 
@@ -26,11 +27,11 @@ def main():
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
-    print("\nStep 1: Loading embeddings from ChromaDB...")
-    storage = ChromaStorage(persist_directory=str(CHROMA_DB_DIR))
+    print("\nStep 1: Loading embeddings from vector store...")
+    storage = create_storage()
 
-    all_data = storage.get_all_samples()
-    embeddings = np.array(all_data["embeddings"])
+    all_data = load_samples(storage)
+    embeddings = all_data["embeddings"]
     metadata = all_data["metadatas"]
 
     print(f"Loaded: {len(embeddings)} samples")
@@ -98,8 +99,7 @@ def main():
     print(f"Saved cluster labels: {labels_path}")
 
     clusters_json_path = PROCESSED_DIR / "clusters_analysis.json"
-    with open(clusters_json_path, "w") as f:
-        json.dump(clusters_info, f, indent=2)
+    write_json_atomic(clusters_json_path, clusters_info)
     print(f"Saved cluster analysis: {clusters_json_path}")
 
     metadata_with_clusters = []
@@ -111,8 +111,7 @@ def main():
         metadata_with_clusters.append(meta_copy)
 
     metadata_path = PROCESSED_DIR / "metadata_with_clusters.json"
-    with open(metadata_path, "w") as f:
-        json.dump(metadata_with_clusters, f, indent=2)
+    write_json_atomic(metadata_path, metadata_with_clusters)
     print(f"Saved enhanced metadata: {metadata_path}")
 
     k_analysis_path = PROCESSED_DIR / "k_analysis.json"
@@ -1,4 +1,6 @@
 import sys
+import time
+import argparse
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
@@ -6,60 +8,249 @@ sys.path.append(str(Path(__file__).parent.parent))
 from src.ingestion.audio_loader import AudioLoader
 from src.ingestion.audio_processor import AudioProcessor
 from src.embeddings.audio_embedder import AudioEmbedder
-from src.storage.chroma_client import ChromaStorage
+from src.storage.backends import create_storage
+from src.ingestion.pipeline import stream_ingest
+from src.ingestion.feature_cache import FeatureCache
+from src.ingestion.manifest import FileManifest
+from src.storage.stats import CollectionStats
+from src.storage.knn_graph import refresh_knn_graph
+from src.storage.segment_index import SegmentIndex
+from config.settings import (
+    N_WORKERS,
+    BATCH_CHUNK_SIZE,
+    INGEST_BATCH_SIZE,
+    SAMPLE_RATE,
+    N_MFCC,
+    N_CHROMA,
+    FEATURE_CACHE_DIR,
+    FEATURE_CACHE_MAX_MB,
+    MANIFEST_PATH,
+    STATS_PATH,
+    VECTOR_BACKEND,
+    KNN_GRAPH_PATH,
+    KNN_GRAPH_K,
+    KNN_BLOCK_SIZE,
+    SEGMENT_INDEX_DIR,
+    SEGMENT_SECONDS,
+    SEGMENT_HOP_SECONDS,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the audio sample database")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=N_WORKERS,
+        help="Number of worker processes for decoding and feature extraction",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BATCH_CHUNK_SIZE,
+        help="Number of files sent to a worker at a time",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=INGEST_BATCH_SIZE,
+        help="Number of samples embedded and stored per database write",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always decode and extract, ignoring the feature cache",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Invalidate the feature cache before building",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-process every file instead of only new and changed ones",
+    )
+    parser.add_argument(
+        "--segments",
+        action="store_true",
+        help="Also index overlapping windows of each processed file for "
+        "/search/segments (use with --full to cover existing files)",
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print("BUILDING AUDIO SAMPLE DATABASE")
     print("=" * 60)
 
     data_path = Path(__file__).parent.parent / "data" / "raw"
-    db_path = Path(__file__).parent.parent / "chroma_db"
 
     print(f"\nData directory: {data_path.absolute()}")
-    print(f"DB directory: {db_path.absolute()}")
+    print(f"Vector backend: {VECTOR_BACKEND}")
+
+    cache = None
+    if not args.no_cache:
+        cache = FeatureCache(
+            FEATURE_CACHE_DIR,
+            sample_rate=SAMPLE_RATE,
+            n_mfcc=N_MFCC,
+            n_chroma=N_CHROMA,
+            max_size_mb=FEATURE_CACHE_MAX_MB,
+        )
+        if args.clear_cache:
+            cache.invalidate()
+        print(f"Feature cache: {cache.version_dir}")
+
+    segment_index = None
+    if args.segments:
+        segment_index = SegmentIndex(
+            SEGMENT_INDEX_DIR, SEGMENT_SECONDS, SEGMENT_HOP_SECONDS
+        )
+        print(
+            f"Segment index: {segment_index.window_seconds}s windows every "
+            f"{segment_index.hop_seconds}s"
+        )
 
-    loader = AudioLoader(str(data_path))
-    processor = AudioProcessor()
+    loader = AudioLoader(str(data_path), sample_rate=SAMPLE_RATE)
+    processor = AudioProcessor(
+        n_mfcc=N_MFCC,
+        n_chroma=N_CHROMA,
+        cache=cache,
+        segments=(
+            (segment_index.window_seconds, segment_index.hop_seconds)
+            if segment_index is not None
+            else None
+        ),
+    )
     embedder = AudioEmbedder()
-    storage = ChromaStorage(persist_directory=str(db_path))
+    storage = create_storage()
+
+    manifest = FileManifest(MANIFEST_PATH)
+    if storage.count() == 0 and manifest.entries:
+        print("Vector store is empty; ignoring stale manifest entries")
+        manifest.reset()
+
+    stats = CollectionStats(STATS_PATH)
+    if not stats.exists() or stats.total != storage.count():
+        stats.rebuild(storage)
+
+    print("\nScanning audio files against manifest...")
+    diff = manifest.diff(loader.iter_files(), full=args.full)
+    scanned = len(diff["new"]) + len(diff["changed"]) + diff["unchanged"]
+    print(
+        f"Scanned: {scanned} files "
+        f"(new: {len(diff['new'])}, changed: {len(diff['changed'])}, "
+        f"deleted: {len(diff['deleted'])}, unchanged: {diff['unchanged']})"
+    )
+
+    if diff["deleted"]:
+        deleted_ids = [manifest.remove(key) for key in diff["deleted"]]
+        with stats.update():
+            stats.remove(storage.get_samples(deleted_ids)["metadatas"])
+            storage.delete_samples(deleted_ids)
+        if segment_index is not None:
+            segment_index.delete(deleted_ids)
+        manifest.save()
+        print(f"Deleted: {len(deleted_ids)} samples")
 
-    print("\nStep 1: Loading audio files...")
-    all_audio = loader.load_all()
-    print(f"Loaded: {len(all_audio)} samples")
+    stored_ids = []
 
-    if len(all_audio) == 0:
-        print("No audio files found")
+    def update_knn_graph():
+        # Only maintain a graph that build_knn_graph.py has created
+        if KNN_GRAPH_PATH.exists() and (diff["deleted"] or stored_ids):
+            graph = refresh_knn_graph(
+                storage,
+                KNN_GRAPH_PATH,
+                k=KNN_GRAPH_K,
+                changed=stored_ids,
+                block_size=KNN_BLOCK_SIZE,
+            )
+            print(f"Updated kNN graph: {len(graph.ids)} samples")
+
+    to_process = diff["new"] + diff["changed"]
+    if not to_process:
+        manifest.save()
+        update_knn_graph()
+        print("Database is up to date")
         return
 
-    print("\nStep 2: Extracting audio features...")
-    processed = processor.process_batch(all_audio)
-    print(f"Processed: {len(processed)} samples")
+    def assign_id(processed):
+        return manifest.assign_id(processed["metadata"]["path"])
 
-    print("\nStep 3: Generating embeddings...")
-    embeddings = embedder.generate_embeddings_batch(processed)
-    print(f"Generated: {len(embeddings)} embeddings")
-    print(f"Embedding dimension: {embedder.get_feature_dimension()}")
+    def uncount_replaced(batch, ids):
+        # Upserts over existing ids move counts instead of adding to them
+        with stats.update():
+            stats.remove(storage.get_samples(ids)["metadatas"])
+
+    def commit(batch, ids):
+        for processed, sample_id in zip(batch, ids):
+            manifest.record(
+                processed["metadata"]["path"],
+                sample_id,
+                processed.get("content_hash"),
+            )
+
+        stored_ids.extend(ids)
+        if segment_index is not None:
+            segment_index.upsert(
+                ids, [embedder.normalize(processed["segments"]) for processed in batch]
+            )
+        with stats.update():
+            stats.add(
+                [processed["metadata"] for processed in batch],
+                embedding_dimension=embedder.get_feature_dimension(),
+            )
+        manifest.save()
+
+    def report(stored):
+        elapsed = time.perf_counter() - start
+        print(
+            f"  Stored {stored} samples ({stored / max(elapsed, 1e-9):.2f} files/sec)"
+        )
 
-    print("\nStep 4: Storing in ChromaDB...")
-    ids = [f"sample_{i}" for i in range(len(processed))]
-    metadata = [p["metadata"] for p in processed]
+    print(
+        f"\nStreaming decode -> extract -> embed -> store "
+        f"({args.workers} workers, batches of {args.batch_size})..."
+    )
+    start = time.perf_counter()
+    processed = processor.iter_files(
+        to_process, loader, workers=args.workers, chunksize=args.chunk_size
+    )
+    summary = stream_ingest(
+        processed,
+        embedder,
+        storage,
+        batch_size=args.batch_size,
+        on_batch=report,
+        assign_id=assign_id,
+        on_commit=commit,
+        upsert=True,
+        before_commit=uncount_replaced,
+    )
+    elapsed = time.perf_counter() - start
 
-    storage.add_samples(embeddings, metadata, ids)
+    print(f"\nProcessed: {summary['total']} samples in {elapsed:.1f}s")
+    print(f"Throughput: {len(to_process) / max(elapsed, 1e-9):.2f} files/sec")
+    print(f"Embedding dimension: {embedder.get_feature_dimension()}")
     print(f"Stored: {storage.count()} samples in database")
 
+    update_knn_graph()
+
+    if cache is not None:
+        evicted = cache.evict()
+        if evicted:
+            print(f"Evicted {evicted} feature cache entries")
+
     print("\n" + "=" * 60)
     print("DATABASE BUILD COMPLETE")
     print("=" * 60)
 
-    print("\nGenre distribution:")
-    genres = {}
-    for meta in metadata:
-        genre = meta["genre"]
-        genres[genre] = genres.get(genre, 0) + 1
-
-    for genre, count in sorted(genres.items()):
+    print("\nGenre distribution (processed this run):")
+    for genre, count in sorted(summary["genres"].items()):
         print(f"  {genre}: {count}")
 
 
@@ -0,0 +1,62 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.backends import create_storage
+from src.storage.knn_graph import refresh_knn_graph
+from config.settings import KNN_GRAPH_PATH, KNN_GRAPH_K, KNN_BLOCK_SIZE
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Precompute the top-k neighbour graph of every stored sample"
+    )
+    parser.add_argument(
+        "--k", type=int, default=KNN_GRAPH_K, help="Neighbours kept per sample"
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=KNN_BLOCK_SIZE,
+        help="Rows per distance tile; memory is block_size^2 floats per thread",
+    )
+    parser.add_argument(
+        "--threads", type=int, default=None, help="Threads (default: CPU count)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild from scratch instead of updating the saved graph",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("BUILDING K-NEAREST-NEIGHBOUR GRAPH")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    graph = refresh_knn_graph(
+        create_storage(),
+        KNN_GRAPH_PATH,
+        k=args.k,
+        full=args.full,
+        block_size=args.block_size,
+        n_threads=args.threads,
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"\nSamples: {len(graph.ids)}")
+    print(f"Neighbours per sample: {graph.k}")
+    print(f"Time: {elapsed:.1f}s")
+    print(f"Saved: {KNN_GRAPH_PATH}")
+
+
+if __name__ == "__main__":
+    main()
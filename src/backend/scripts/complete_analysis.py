@@ -5,17 +5,18 @@ import json
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.storage.chroma_client import ChromaStorage
+from src.storage.backends import create_storage
+from src.storage.export import load_samples
 from src.models.clustering import AudioClusterer, find_optimal_k, analyze_clusters
 from src.models.dimensionality_reduction import DimensionalityReducer
 from src.models.anomaly_detector import AnomalyDetector
+from utils.atomic import write_json_atomic
 from config.settings import (
     N_CLUSTERS,
     CLUSTERING_METHOD,
     REDUCTION_METHOD,
     PROCESSED_DIR,
     MODELS_DIR,
-    CHROMA_DB_DIR,
 )
 
 
@@ -23,9 +24,9 @@ def main():
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
-    storage = ChromaStorage(persist_directory=str(CHROMA_DB_DIR))
-    all_data = storage.get_all_samples()
-    embeddings = np.array(all_data["embeddings"])
+    storage = create_storage()
+    all_data = load_samples(storage)
+    embeddings = all_data["embeddings"]
     metadata = all_data["metadatas"]
 
     k_analysis = find_optimal_k(embeddings, k_range=(2, 10))
@@ -91,8 +92,7 @@ def main():
             json.dump(centroid_info, f, indent=2)
 
     clusters_info = analyze_clusters(embeddings, clusterer.labels, metadata)
-    with open(PROCESSED_DIR / "clusters_analysis.json", "w") as f:
-        json.dump(clusters_info, f, indent=2)
+    write_json_atomic(PROCESSED_DIR / "clusters_analysis.json", clusters_info)
 
     with open(PROCESSED_DIR / "k_analysis.json", "w") as f:
         json.dump(k_analysis, f, indent=2)
@@ -107,8 +107,7 @@ def main():
         meta_copy["anomaly_score"] = float(scores[i])
         metadata_enhanced.append(meta_copy)
 
-    with open(PROCESSED_DIR / "metadata_with_clusters.json", "w") as f:
-        json.dump(metadata_enhanced, f, indent=2)
+    write_json_atomic(PROCESSED_DIR / "metadata_with_clusters.json", metadata_enhanced)
 
     with open(PROCESSED_DIR / "metadata_with_anomalies.json", "w") as f:
         json.dump(metadata_enhanced, f, indent=2)
@@ -5,16 +5,18 @@ import json
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.storage.chroma_client import ChromaStorage
+from src.storage.backends import create_storage
+from src.storage.export import load_samples
 from src.models.anomaly_detector import AnomalyDetector
-from config.settings import CHROMA_DB_DIR, PROCESSED_DIR
+from src.storage.knn_graph import KnnGraph
+from config.settings import PROCESSED_DIR, KNN_GRAPH_PATH
 
 
 def main():
-    storage = ChromaStorage(persist_directory=str(CHROMA_DB_DIR))
-    all_data = storage.get_all_samples()
+    storage = create_storage()
+    all_data = load_samples(storage)
 
-    embeddings = np.array(all_data["embeddings"])
+    embeddings = all_data["embeddings"]
     metadata = all_data["metadatas"]
 
     detector = AnomalyDetector(contamination=0.1)
@@ -25,6 +27,12 @@ def main():
 
     anomaly_indices = np.where(predictions == -1)[0]
 
+    # Mean distance to the precomputed neighbours, when the graph is built
+    knn_scores = {}
+    if KNN_GRAPH_PATH.exists():
+        graph = KnnGraph.load(KNN_GRAPH_PATH)
+        knn_scores = dict(zip(graph.ids, graph.mean_distances().tolist()))
+
     metadata_file = PROCESSED_DIR / "metadata_with_clusters.json"
 
     if metadata_file.exists():
@@ -36,6 +44,8 @@ def main():
     for i in range(len(metadata_enhanced)):
         metadata_enhanced[i]["is_anomaly"] = bool(predictions[i] == -1)
         metadata_enhanced[i]["anomaly_score"] = float(scores[i])
+        if all_data["ids"][i] in knn_scores:
+            metadata_enhanced[i]["knn_distance"] = knn_scores[all_data["ids"][i]]
 
     output_path = PROCESSED_DIR / "metadata_with_anomalies.json"
     with open(output_path, "w") as f:
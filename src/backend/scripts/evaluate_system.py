@@ -3,24 +3,23 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-import numpy as np
-from src.storage.chroma_client import ChromaStorage
+from src.storage.backends import create_storage
+from src.storage.export import load_samples
 from src.models.anomaly_detector import AnomalyDetector
 from src.models.classifier import GenreClassifier
 
 
 def main():
-    db_path = Path(__file__).parent.parent / "chroma_db"
-    storage = ChromaStorage(persist_directory=str(db_path))
+    storage = create_storage()
 
-    print("Loading data from ChromaDB...")
-    all_data = storage.get_all_samples()
+    print("Loading data from vector store...")
+    all_data = load_samples(storage)
 
-    if not all_data["embeddings"]:
-        print("No data found in ChromaDB")
+    if len(all_data["embeddings"]) == 0:
+        print("No data found in vector store")
         return
 
-    embeddings = np.array(all_data["embeddings"])
+    embeddings = all_data["embeddings"]
     metadata = all_data["metadatas"]
     genres = [m["genre"] for m in metadata]
 
@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List
+
+
+class ExecutorSaturated(Exception):
+    pass
+
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU-bound request work with a cap on queued jobs.
+
+    Jobs are awaited from the event loop, so decoding and feature extraction
+    never block it. Once `max_pending` jobs are queued or running, new work
+    is refused with ExecutorSaturated instead of piling up latency.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool = None
+
+    def start(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _reserve(self, n: int):
+        if self.pending + n > self.max_pending:
+            raise ExecutorSaturated(
+                f"{self.pending} jobs pending, limit is {self.max_pending}"
+            )
+        self.start()
+        self.pending += n
+
+    async def run(self, func: Callable, *args):
+        self._reserve(1)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def map(self, func: Callable, *iterables: Iterable) -> List:
+        """Run func over zipped iterables, admitting the whole batch or none of it"""
+        calls = list(zip(*iterables))
+        self._reserve(len(calls))
+        try:
+            loop = asyncio.get_running_loop()
+            return await asyncio.gather(
+                *[loop.run_in_executor(self._pool, func, *args) for args in calls]
+            )
+        finally:
+            self.pending -= len(calls)
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import sys
+import tarfile
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.api.uploads import UPLOAD_CHUNK_SIZE, check_magic
+from config.settings import MAX_UPLOAD_SIZE_MB, MAX_BULK_EXTRACT_MB
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac"}
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class IngestJob:
+    """One bulk ingest request: its staged files, progress and errors"""
+
+    def __init__(self, directory: Path, genre: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.directory = Path(directory) / self.id
+        self.genre = genre
+        self.status = "queued"
+        self.files: List[Dict] = []
+        self.archives: List[Tuple[Path, str]] = []
+        self.processed = 0
+        self.succeeded = 0
+        self.rejected = 0
+        self.errors: List[Dict] = []
+        self.sample_ids: List[str] = []
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def stage_path(self, filename: str) -> Path:
+        """Unique path inside the job directory, keeping the file's suffix"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lower = filename.lower()
+        suffix = next(
+            (s for s in ARCHIVE_SUFFIXES if lower.endswith(s)), Path(lower).suffix
+        )
+        count = len(self.files) + len(self.archives)
+        return self.directory / f"{count:06d}{suffix}"
+
+    def add_file(self, path: Path, filename: str, genre: Optional[str] = None):
+        self.files.append(
+            {"path": str(path), "filename": filename, "genre": genre or self.genre}
+        )
+
+    def add_archive(self, path: Path, filename: str):
+        self.archives.append((path, filename))
+
+    def fail_file(self, filename: str, error: str):
+        self.errors.append({"filename": filename, "error": error})
+
+    def reject(self, filename: str, error: str):
+        """Record an upload that never became a processable file"""
+        self.rejected += 1
+        self.fail_file(filename, error)
+
+    def expand_archives(
+        self,
+        max_member_mb: int = MAX_UPLOAD_SIZE_MB,
+        max_total_mb: int = MAX_BULK_EXTRACT_MB,
+    ):
+        """
+        Unpack staged archives, keeping audio members only.
+
+        Members get the same size and magic number checks as direct uploads,
+        and the job stops unpacking once max_total_mb has been written, so a
+        small archive cannot expand to fill the disk.
+        """
+        member_limit = max_member_mb * 1024 * 1024
+        budget = max_total_mb * 1024 * 1024
+        exhausted = False
+
+        for archive, filename in self.archives:
+            try:
+                for name, genre, size, reader in iter_archive_members(archive):
+                    if exhausted:
+                        break
+                    if size > member_limit:
+                        self.reject(name, f"File too large. Max: {max_member_mb}MB")
+                        continue
+                    if size > budget:
+                        exhausted = True
+                        break
+
+                    path = self.stage_path(name)
+                    try:
+                        with reader() as src:
+                            written = _copy_member(
+                                src, path, name, min(member_limit, budget)
+                            )
+                    except HTTPException as e:
+                        path.unlink(missing_ok=True)
+                        self.reject(name, e.detail)
+                        continue
+
+                    budget -= written
+                    self.add_file(path, name, self.genre or genre)
+
+                if exhausted:
+                    self.reject(
+                        filename,
+                        f"Archives unpack to more than {max_total_mb}MB; "
+                        "remaining members skipped",
+                    )
+            except (zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+                self.reject(filename, f"Unreadable archive: {e}")
+            finally:
+                archive.unlink(missing_ok=True)
+        self.archives = []
+
+    def as_dict(self) -> Dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total_files": len(self.files) + self.rejected,
+            "processed": self.processed,
+            "succeeded": self.succeeded,
+            "failed": len(self.errors),
+            "files_per_sec": self.processed / elapsed if elapsed > 0 else 0.0,
+            "elapsed_seconds": elapsed,
+            "errors": self.errors,
+        }
+
+
+def iter_archive_members(archive: Path):
+    """
+    Yield (name, genre, size, open_member) for every audio file in a zip or
+    tar; size is the uncompressed size the archive declares.
+
+    Member paths are never used on disk, so crafted names cannot escape the
+    job directory; the parent directory name becomes the default genre.
+    """
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                member = Path(info.filename)
+                if info.is_dir() or member.suffix.lower() not in AUDIO_EXTENSIONS:
+                    continue
+                yield (
+                    member.name,
+                    _folder_genre(member),
+                    info.file_size,
+                    partial(zf.open, info),
+                )
+        return
+
+    with tarfile.open(archive) as tf:
+        for info in tf:
+            member = Path(info.name)
+            if not info.isfile() or member.suffix.lower() not in AUDIO_EXTENSIONS:
+                continue
+            yield (
+                member.name,
+                _folder_genre(member),
+                info.size,
+                partial(tf.extractfile, info),
+            )
+
+
+def _copy_member(src, path: Path, filename: str, max_bytes: int) -> int:
+    """
+    Copy an archive member in chunks, checking its magic number first and
+    stopping at max_bytes whatever size the archive declared
+    """
+    written = 0
+    with open(path, "wb") as dst:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            if not written:
+                check_magic(chunk, filename)
+            written += len(chunk)
+            if written > max_bytes:
+                raise HTTPException(413, "Archive member larger than allowed")
+            dst.write(chunk)
+
+    if not written:
+        check_magic(b"", filename)
+    return written
+
+
+def _folder_genre(member: Path) -> Optional[str]:
+    name = member.parent.name
+    return name if name not in ("", ".", "..") else None
+
+
+class JobQueue:
+    """
+    Background queue that runs ingest jobs one at a time on the event loop.
+
+    `runner` does the work for a job; parallelism within a job comes from
+    the extraction pool. Finished jobs stay queryable until `max_finished`
+    newer ones have completed.
+    """
+
+    def __init__(
+        self, runner: Callable[[IngestJob], Awaitable[None]], max_finished: int = 100
+    ):
+        self.runner = runner
+        self.max_finished = max_finished
+        self.jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._work())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def submit(self, job: IngestJob) -> IngestJob:
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self.jobs.get(job_id)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                await self.runner(job)
+                job.status = "completed"
+            except Exception as e:
+                logger.error(f"Ingest job {job.id} failed: {e}")
+                job.status = "failed"
+                job.fail_file("*", str(e))
+            finally:
+                job.finished_at = time.time()
+                shutil.rmtree(job.directory, ignore_errors=True)
+                self._prune()
+
+    def _prune(self):
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ("completed", "failed")
+        ]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
@@ -1,38 +1,151 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from pathlib import Path
-import tempfile
+from typing import List, Optional
+import asyncio
 import sys
+import uuid
 import logging
-import json
 import numpy as np
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from src.ingestion.audio_loader import AudioLoader
-from src.ingestion.audio_processor import AudioProcessor
-from src.embeddings.audio_embedder import AudioEmbedder
-from src.storage.chroma_client import ChromaStorage
-from src.models.clustering import AudioClusterer
+from src.storage.backends import create_storage
+from src.storage.stats import CollectionStats
+from src.storage.metadata_store import MetadataStore
+from src.storage.write_buffer import WriteBehindBuffer
+from src.storage.knn_graph import KnnGraphStore
+from src.storage.filters import build_where
+from src.storage.segment_index import SegmentIndex
+from src.models.registry import ClustererRegistry
 from src.api.models import (
     SearchResponse,
     GenreStats,
     HealthResponse,
     QueryInfo,
     SearchResult,
+    BatchSearchItem,
+    BatchSearchResponse,
+    VectorSearchRequest,
+    VectorSearchResponse,
+    IdSearchRequest,
+    SegmentResult,
+    SegmentSearchResponse,
+)
+from src.api.executor import BoundedProcessPool, ExecutorSaturated
+from src.api.query_cache import QueryCache
+from src.api.range_search import decode_cursor, stream_matches
+from src.api.jobs import AUDIO_EXTENSIONS, IngestJob, JobQueue, is_archive
+from src.api.uploads import read_upload, save_upload, max_request_bytes
+from src.api.workers import (
+    embed_audio_bytes,
+    process_audio_bytes,
+    process_stored_file,
+)
+from src.ingestion.pipeline import iter_batches
+from utils.validators import validate_search_params
+from config.settings import (
+    PROCESSED_DIR,
+    CLUSTERER_PATH,
+    STATS_PATH,
+    EMBEDDING_DIM,
+    EXTRACTION_WORKERS,
+    EXTRACTION_MAX_PENDING,
+    RETRY_AFTER_SECONDS,
+    MAX_BATCH_FILES,
+    MAX_BATCH_VECTORS,
+    QUERY_CACHE_SIZE,
+    QUERY_CACHE_TTL,
+    BULK_INGEST_BATCH_SIZE,
+    MAX_BULK_UPLOAD_MB,
+    MAX_UPLOAD_SIZE_MB,
+    INGEST_JOBS_DIR,
+    WRITE_BUFFER_MAX_ITEMS,
+    WRITE_BUFFER_MAX_DELAY,
+    WRITE_LOG_PATH,
+    KNN_GRAPH_PATH,
+    MAX_RANGE_RESULTS,
+    SEGMENT_INDEX_DIR,
+    SEGMENT_SECONDS,
+    SEGMENT_HOP_SECONDS,
 )
-from utils.validators import validate_audio_file, validate_search_params
-from config.settings import CHROMA_DB_DIR, PROCESSED_DIR, MODELS_DIR
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+extraction_pool = BoundedProcessPool(
+    max_workers=EXTRACTION_WORKERS, max_pending=EXTRACTION_MAX_PENDING
+)
+cluster_registry = ClustererRegistry(CLUSTERER_PATH)
+knn_graph = KnnGraphStore(KNN_GRAPH_PATH)
+segment_index = SegmentIndex(SEGMENT_INDEX_DIR, SEGMENT_SECONDS, SEGMENT_HOP_SECONDS)
+
+
+async def run_ingest_job(job: IngestJob):
+    await asyncio.to_thread(job.expand_archives)
+
+    # A batch larger than the pool's queue could never be admitted
+    batch_size = min(BULK_INGEST_BATCH_SIZE, EXTRACTION_MAX_PENDING)
+    for batch in iter_batches(job.files, batch_size):
+        while True:
+            try:
+                outcomes = await extraction_pool.map(
+                    process_stored_file,
+                    [f["path"] for f in batch],
+                    [f["filename"] for f in batch],
+                    [f["genre"] or "unknown" for f in batch],
+                )
+                break
+            except ExecutorSaturated:
+                await asyncio.sleep(RETRY_AFTER_SECONDS / 10)
+
+        processed = []
+        for file, outcome in zip(batch, outcomes):
+            if outcome is None:
+                job.fail_file(file["filename"], "Failed to load audio file")
+            else:
+                processed.append(outcome)
+
+        if processed:
+            ids = await asyncio.to_thread(
+                store_samples,
+                np.stack([p["embedding"] for p in processed]),
+                [p["metadata"] for p in processed],
+            )
+            job.sample_ids.extend(ids)
+
+        job.processed += len(batch)
+        job.succeeded += len(processed)
+
+    logger.info(
+        f"Ingest job {job.id} finished: {job.succeeded}/{len(job.files)} files stored"
+    )
+
+
+job_queue = JobQueue(run_ingest_job)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    extraction_pool.start()
+    cluster_registry.refresh()
+    job_queue.start()
+    write_buffer.start()
+    yield
+    await job_queue.stop()
+    write_buffer.close()
+    extraction_pool.shutdown()
+
+
 app = FastAPI(
     title="Audio Samples Semantic Search API",
     description="Sistema de búsqueda semántica para samples de música electrónica",
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -43,11 +156,95 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-storage = ChromaStorage(persist_directory=str(CHROMA_DB_DIR))
-processor = AudioProcessor()
-embedder = AudioEmbedder()
 
-MAX_FILE_SIZE = 10 * 1024 * 1024
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Refuse before the multipart body is parsed and spooled; chunked
+    # requests without Content-Length are bounded later by read_upload
+    limit = max_request_bytes(request.url.path)
+    content_length = request.headers.get("content-length")
+    if limit and content_length and content_length.isdigit():
+        if int(content_length) > limit:
+            return JSONResponse(status_code=413, content={"detail": "Upload too large"})
+    return await call_next(request)
+
+
+storage = create_storage()
+stats = CollectionStats(STATS_PATH)
+metadata_store = MetadataStore(
+    PROCESSED_DIR / "metadata_with_clusters.json",
+    PROCESSED_DIR / "clusters_analysis.json",
+)
+
+
+def collection_version():
+    """
+    Changes whenever any process writes to the collection: the store's own
+    version plus the stats file mtime, which every writer saves after it
+    commits (Chroma's count alone misses in-place updates)
+    """
+    try:
+        saved = STATS_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        saved = None
+    return storage.version(), saved
+
+
+query_cache = QueryCache(
+    max_items=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL, version_fn=collection_version
+)
+write_buffer = WriteBehindBuffer(
+    storage,
+    WRITE_LOG_PATH,
+    max_items=WRITE_BUFFER_MAX_ITEMS,
+    max_delay=WRITE_BUFFER_MAX_DELAY,
+    on_flush=lambda ids: query_cache.bump_version(),
+)
+
+
+def raise_saturated(e: ExecutorSaturated):
+    logger.warning(f"Extraction pool saturated: {e}")
+    raise HTTPException(
+        503,
+        "Server is busy processing audio. Please retry later.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+def store_samples(embeddings: np.ndarray, metadatas: List[dict]) -> List[str]:
+    """
+    Assign clusters and collision-free ids, hand the batch to the write-behind
+    buffer and update the stats counters; returns the new sample ids.
+    """
+    ids = [f"sample_{uuid.uuid4().hex}" for _ in metadatas]
+    for embedding, metadata in zip(embeddings, metadatas):
+        metadata["cluster"] = cluster_registry.assign(embedding)
+
+    write_buffer.add_samples(embeddings=embeddings, metadata=metadatas, ids=ids)
+
+    stats.sync(storage)
+    with stats.update():
+        stats.add(metadatas, embedding_dimension=embeddings.shape[1])
+
+    return ids
+
+
+def format_results(results, query_index=0, exclude=None, limit=None):
+    formatted = [
+        SearchResult(
+            sample_id=sample_id,
+            filename=meta["filename"],
+            genre=meta["genre"],
+            distance=float(dist),
+        )
+        for sample_id, meta, dist in zip(
+            results["ids"][query_index],
+            results["metadatas"][query_index],
+            results["distances"][query_index],
+        )
+        if sample_id != exclude
+    ]
+    return formatted[:limit] if limit is not None else formatted
 
 
 @app.get("/", response_model=HealthResponse)
@@ -58,89 +255,437 @@ def root():
         message="Audio Samples Semantic Search API v2.0",
         endpoints=[
             "/stats",
+            "/stats/rebuild",
             "/search",
+            "/search/range",
+            "/search/segments",
+            "/search/batch",
+            "/search/vectors",
+            "/search/by-id/{sample_id}",
             "/clusters",
             "/search-by-filters",
             "/ingest",
+            "/ingest/bulk",
+            "/ingest/jobs/{job_id}",
+            "/cache/stats",
             "/docs",
         ],
     )
 
 
+def stats_response() -> GenreStats:
+    return GenreStats(
+        total_samples=stats.total,
+        genres=stats.genres,
+        clusters=stats.clusters,
+        embedding_dimension=stats.embedding_dimension,
+    )
+
+
 @app.get("/stats", response_model=GenreStats)
 def get_stats():
-    """Get dataset statistics"""
+    """Get dataset statistics from the incrementally maintained counters"""
     try:
-        all_data = storage.get_all_samples()
-        genres = {}
-
-        for meta in all_data["metadatas"]:
-            genre = meta["genre"]
-            genres[genre] = genres.get(genre, 0) + 1
-
-        return GenreStats(
-            total_samples=storage.count(), genres=genres, embedding_dimension=45
-        )
+        stats.sync(storage)
+        return stats_response()
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
         raise HTTPException(500, "Error retrieving statistics")
 
 
+@app.post("/stats/rebuild", response_model=GenreStats)
+def rebuild_stats():
+    """Recompute the statistics counters with a full scan of the collection"""
+    try:
+        stats.rebuild(storage)
+        return stats_response()
+    except Exception as e:
+        logger.error(f"Error rebuilding stats: {e}")
+        raise HTTPException(500, "Error rebuilding statistics")
+
+
+async def embed_upload(file: UploadFile):
+    """Query embedding of an upload, extracted in the pool unless cached"""
+    content = await read_upload(file)
+    content_key = query_cache.content_key(content)
+
+    embedded = query_cache.get_embedding(content_key)
+    if embedded is None:
+        try:
+            embedded = await extraction_pool.run(
+                embed_audio_bytes, content, file.filename
+            )
+        except ExecutorSaturated as e:
+            raise_saturated(e)
+
+        if not embedded:
+            raise HTTPException(400, "Failed to load audio file")
+
+        query_cache.put_embedding(content_key, embedded)
+    return embedded
+
+
 @app.post("/search", response_model=SearchResponse)
 async def search_similar(
     file: UploadFile = File(..., description="Audio file (MP3/WAV/FLAC, max 10MB)"),
     n_results: int = Query(5, ge=1, le=20, description="Number of results to return"),
+    genre: Optional[str] = Query(None, description="Only return this genre"),
+    cluster: Optional[int] = Query(None, description="Only return this cluster"),
+    min_duration: Optional[float] = Query(None, ge=0, description="Seconds"),
+    max_duration: Optional[float] = Query(None, ge=0, description="Seconds"),
+    is_anomaly: Optional[bool] = Query(None, description="Filter on anomaly flag"),
 ):
-    """Search for similar audio samples using semantic similarity"""
+    """
+    Search for similar audio samples using semantic similarity. Filters are
+    applied by the vector store before ranking, so up to n_results matching
+    samples are returned.
+    """
     validate_search_params(n_results)
+    if (
+        min_duration is not None
+        and max_duration is not None
+        and min_duration > max_duration
+    ):
+        raise HTTPException(400, "min_duration must not exceed max_duration")
+    where = build_where(genre, cluster, min_duration, max_duration, is_anomaly)
 
-    content = await file.read()
-    file_size = len(content)
+    try:
+        embedded = await embed_upload(file)
+
+        # Key on the version read before searching, so a write that lands
+        # mid-search leaves these results under an already stale key
+        key = query_cache.result_key(embedded["embedding"], n_results, where)
+        results = query_cache.results.get(key)
+        if results is None:
+            results = storage.search_similar(
+                embedded["embedding"], n_results, where=where
+            )
+            query_cache.results.put(key, results)
 
-    validate_audio_file(file.filename, file_size)
+        search_results = format_results(results)
 
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=Path(file.filename).suffix
-    ) as tmp:
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
+        logger.info(
+            f"Search completed: {file.filename}, found {len(search_results)} results"
+        )
 
-    try:
-        loader = AudioLoader(str(tmp_path.parent))
-        audio_data = loader.load_audio(tmp_path)
+        return SearchResponse(
+            query=QueryInfo(filename=file.filename, duration=embedded["duration"]),
+            results=search_results,
+        )
 
-        if not audio_data:
-            raise HTTPException(400, "Failed to load audio file")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing search: {e}")
+        raise HTTPException(500, "Error processing audio file")
 
-        processed = processor.extract_features(audio_data)
-        query_embedding = embedder.generate_embedding(processed)
 
-        results = storage.search_similar(query_embedding, n_results)
+@app.post("/search/range")
+async def search_range(
+    file: Optional[UploadFile] = File(
+        None, description="Query audio; not needed when following a cursor"
+    ),
+    max_distance: float = Query(
+        0.05, ge=0, le=2, description="Cosine distance bound (0 = identical)"
+    ),
+    limit: int = Query(
+        1000, ge=1, le=MAX_RANGE_RESULTS, description="Matches per response"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor from the last page"),
+):
+    """
+    Every sample within `max_distance` of the query, streamed as NDJSON in
+    collection order. The last line holds `next_cursor`; pass it back (with
+    no file) to continue after `limit` matches.
+    """
+    offset = 0
+    if cursor:
+        try:
+            embedding, max_distance, offset = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    elif file is None:
+        raise HTTPException(400, "Upload a query file or pass a cursor")
+    else:
+        embedding = (await embed_upload(file))["embedding"]
+
+    return StreamingResponse(
+        stream_matches(storage, embedding, max_distance, offset=offset, limit=limit),
+        media_type="application/x-ndjson",
+    )
+
 
-        search_results = [
-            SearchResult(
-                filename=meta["filename"], genre=meta["genre"], distance=float(dist)
+@app.post("/search/segments", response_model=SegmentSearchResponse)
+async def search_segments(
+    file: UploadFile = File(..., description="Query clip (MP3/WAV/FLAC, max 10MB)"),
+    n_results: int = Query(5, ge=1, le=20, description="Number of files to return"),
+):
+    """
+    Find the files containing the region most similar to a short clip, with
+    the time offset of that region, using the sliding-window segment index
+    """
+    try:
+        embedded = await embed_upload(file)
+        if segment_index.count() == 0:
+            raise HTTPException(
+                404, "Segment index is empty; run build_database.py --segments"
             )
-            for meta, dist in zip(results["metadatas"][0], results["distances"][0])
+
+        matches = await asyncio.to_thread(
+            segment_index.search, embedded["embedding"], n_results
+        )
+        samples = storage.get_samples([m["sample_id"] for m in matches])
+        metadatas = dict(zip(samples["ids"], samples["metadatas"]))
+
+        # Windows of samples deleted from the collection are skipped
+        results = [
+            SegmentResult(
+                sample_id=m["sample_id"],
+                filename=metadatas[m["sample_id"]]["filename"],
+                genre=metadatas[m["sample_id"]]["genre"],
+                distance=m["distance"],
+                offset=m["offset"],
+            )
+            for m in matches
+            if m["sample_id"] in metadatas
         ]
 
-        logger.info(
-            f"Search completed: {file.filename}, found {len(search_results)} results"
+        return SegmentSearchResponse(
+            query=QueryInfo(filename=file.filename, duration=embedded["duration"]),
+            results=results,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in segment search: {e}")
+        raise HTTPException(500, "Error processing audio file")
+
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def search_similar_batch(
+    files: List[UploadFile] = File(..., description="Audio files (MP3/WAV/FLAC)"),
+    n_results: int = Query(5, ge=1, le=20, description="Results per query"),
+):
+    """
+    Search for many audio files in one request.
+    Features are extracted in parallel and all queries go to the store at once.
+    """
+    validate_search_params(n_results)
+
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(413, f"Too many files. Max: {MAX_BATCH_FILES}")
+
+    uploads = {}
+    cached = {}
+    errors = {}
+
+    try:
+        for i, file in enumerate(files):
+            try:
+                content = await read_upload(file)
+            except HTTPException as e:
+                errors[i] = e.detail
+                continue
+
+            content_key = query_cache.content_key(content)
+            hit = query_cache.get_embedding(content_key)
+            if hit is not None:
+                cached[i] = hit
+            else:
+                uploads[i] = (content, file.filename, content_key)
+
+        try:
+            contents, filenames, _ = zip(*uploads.values()) if uploads else ((), (), ())
+            outcomes = await extraction_pool.map(embed_audio_bytes, contents, filenames)
+        except ExecutorSaturated as e:
+            raise_saturated(e)
+
+        for (i, upload), outcome in zip(uploads.items(), outcomes):
+            if outcome is None:
+                errors[i] = "Failed to load audio file"
+            else:
+                query_cache.put_embedding(upload[2], outcome)
+                cached[i] = outcome
+
+        embedded = {i: cached[i] for i in sorted(cached)}
+
+        results = None
+        if embedded:
+            query_embeddings = np.stack([o["embedding"] for o in embedded.values()])
+            results = storage.search_similar_batch(query_embeddings, n_results)
+
+        items = []
+        query_index = {i: n for n, i in enumerate(embedded)}
+        for i, file in enumerate(files):
+            if i in errors:
+                items.append(
+                    BatchSearchItem(
+                        query=QueryInfo(filename=file.filename, duration=0.0),
+                        results=[],
+                        error=errors[i],
+                    )
+                )
+            else:
+                items.append(
+                    BatchSearchItem(
+                        query=QueryInfo(
+                            filename=file.filename, duration=embedded[i]["duration"]
+                        ),
+                        results=format_results(results, query_index[i]),
+                    )
+                )
+
+        logger.info(f"Batch search completed: {len(files)} files, {len(errors)} failed")
+
+        return BatchSearchResponse(results=items)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing batch search: {e}")
+        raise HTTPException(500, "Error processing batch search")
+
+
+@app.post("/search/vectors", response_model=VectorSearchResponse)
+def search_by_vectors(request: VectorSearchRequest):
+    """Search with precomputed embeddings; one result list per vector"""
+    if len(request.vectors) > MAX_BATCH_VECTORS:
+        raise HTTPException(413, f"Too many vectors. Max: {MAX_BATCH_VECTORS}")
+
+    if any(len(vector) != EMBEDDING_DIM for vector in request.vectors):
+        raise HTTPException(400, f"Every vector must have {EMBEDDING_DIM} dimensions")
+
+    try:
+        query_embeddings = np.asarray(request.vectors, dtype=np.float32)
+        results = storage.search_similar_batch(query_embeddings, request.n_results)
+
+        return VectorSearchResponse(
+            results=[format_results(results, i) for i in range(len(query_embeddings))]
         )
 
+    except Exception as e:
+        logger.error(f"Error processing vector search: {e}")
+        raise HTTPException(500, "Error processing vector search")
+
+
+def graph_results(sample_ids: List[str], n_results: int):
+    """(metadata, results) for the ids the precomputed kNN graph can answer"""
+    graph = knn_graph.graph
+    if graph is None or n_results > graph.k:
+        return {}
+
+    neighbours = {}
+    for sample_id in sample_ids:
+        found = graph.neighbours(sample_id, n_results)
+        if found is not None and len(found[0]) == n_results:
+            neighbours[sample_id] = found
+    if not neighbours:
+        return {}
+
+    wanted = set(neighbours).union(*(ids for ids, _ in neighbours.values()))
+    samples = storage.get_samples(list(wanted))
+    metadatas = dict(zip(samples["ids"], samples["metadatas"]))
+
+    answered = {}
+    for sample_id, (ids, distances) in neighbours.items():
+        # Samples deleted since the graph was built fall back to a search
+        if sample_id in metadatas and all(i in metadatas for i in ids):
+            results = {
+                "ids": [ids],
+                "metadatas": [[metadatas[i] for i in ids]],
+                "distances": [distances],
+            }
+            answered[sample_id] = (metadatas[sample_id], format_results(results))
+    return answered
+
+
+def search_stored(sample_ids: List[str], n_results: int):
+    """
+    (metadata, results) per known sample id. Ids in the kNN graph are a
+    lookup; the rest query with their stored embeddings, fetching one extra
+    neighbour so the sample itself can be dropped.
+    """
+    answered = graph_results(sample_ids, n_results)
+    remaining = [i for i in sample_ids if i not in answered]
+    if not remaining:
+        return answered
+
+    samples = storage.get_samples(remaining, include_embeddings=True)
+    if samples["ids"]:
+        results = storage.search_similar_batch(samples["embeddings"], n_results + 1)
+        for i, (sample_id, meta) in enumerate(
+            zip(samples["ids"], samples["metadatas"])
+        ):
+            answered[sample_id] = (
+                meta,
+                format_results(results, i, exclude=sample_id, limit=n_results),
+            )
+    return answered
+
+
+@app.get("/search/by-id/{sample_id}", response_model=SearchResponse)
+def search_by_id(
+    sample_id: str,
+    n_results: int = Query(5, ge=1, le=20, description="Number of results to return"),
+):
+    """Find samples similar to one already in the database, without any audio"""
+    try:
+        answered = search_stored([sample_id], n_results)
+        if sample_id not in answered:
+            raise HTTPException(404, f"Sample not found: {sample_id}")
+
+        meta, results = answered[sample_id]
         return SearchResponse(
-            query=QueryInfo(filename=file.filename, duration=audio_data["duration"]),
-            results=search_results,
+            query=QueryInfo(
+                filename=meta["filename"], duration=meta.get("duration", 0.0)
+            ),
+            results=results,
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing search: {e}")
-        raise HTTPException(500, "Error processing audio file")
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink()
+        logger.error(f"Error searching by id: {e}")
+        raise HTTPException(500, "Error searching by sample id")
+
+
+@app.post("/search/by-id", response_model=BatchSearchResponse)
+def search_by_ids(request: IdSearchRequest):
+    """Batch variant of /search/by-id/{sample_id}; unknown ids get an error entry"""
+    if len(request.sample_ids) > MAX_BATCH_VECTORS:
+        raise HTTPException(413, f"Too many sample ids. Max: {MAX_BATCH_VECTORS}")
+
+    try:
+        by_id = search_stored(request.sample_ids, request.n_results)
+
+        items = []
+        for sample_id in request.sample_ids:
+            if sample_id not in by_id:
+                items.append(
+                    BatchSearchItem(
+                        query=QueryInfo(filename=sample_id, duration=0.0),
+                        results=[],
+                        error=f"Sample not found: {sample_id}",
+                    )
+                )
+                continue
+
+            meta, results = by_id[sample_id]
+            items.append(
+                BatchSearchItem(
+                    query=QueryInfo(
+                        filename=meta["filename"], duration=meta.get("duration", 0.0)
+                    ),
+                    results=results,
+                )
+            )
+
+        return BatchSearchResponse(results=items)
+
+    except Exception as e:
+        logger.error(f"Error in batch search by id: {e}")
+        raise HTTPException(500, "Error searching by sample ids")
 
 
 @app.get("/clusters")
@@ -150,16 +695,13 @@ def get_clusters():
     Returns cluster composition, sizes, and genre distribution.
     """
     try:
-        clusters_file = PROCESSED_DIR / "clusters_analysis.json"
-
-        if not clusters_file.exists():
+        try:
+            clusters_info = metadata_store.get_clusters()
+        except FileNotFoundError:
             raise HTTPException(
                 404, "Clustering data not found. Run scripts/analyze_clusters.py first"
             )
 
-        with open(clusters_file, "r") as f:
-            clusters_info = json.load(f)
-
         return {"total_clusters": len(clusters_info), "clusters": clusters_info}
 
     except HTTPException:
@@ -173,37 +715,38 @@ def get_clusters():
 def search_by_filters(
     genre: str = Query(None, description="Filter by genre"),
     cluster: int = Query(None, description="Filter by cluster ID"),
-    limit: int = Query(20, ge=1, le=100, description="Max results"),
+    limit: int = Query(20, ge=1, le=100, description="Max results per page"),
+    offset: int = Query(0, ge=0, description="Number of matches to skip"),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
 ):
     """
     Search samples using filters (genre, cluster).
-    Returns samples matching the criteria.
+    Returns one page of samples matching the criteria; follow `next_cursor`
+    (or raise `offset`) to page through all of them.
     """
     try:
-        metadata_file = PROCESSED_DIR / "metadata_with_clusters.json"
-
-        if not metadata_file.exists():
+        try:
+            page = metadata_store.search(
+                genre=genre or None,
+                cluster=cluster,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+            )
+        except FileNotFoundError:
             raise HTTPException(
                 404, "Metadata not found. Run scripts/analyze_clusters.py first"
             )
-
-        with open(metadata_file, "r") as f:
-            all_metadata = json.load(f)
-
-        filtered = all_metadata
-
-        if genre:
-            filtered = [m for m in filtered if m.get("genre") == genre]
-
-        if cluster is not None:
-            filtered = [m for m in filtered if m.get("cluster") == cluster]
-
-        filtered = filtered[:limit]
+        except ValueError as e:
+            raise HTTPException(400, str(e))
 
         return {
-            "total_results": len(filtered),
+            "total_results": len(page["results"]),
+            "total_matches": page["total_matches"],
+            "offset": page["offset"],
+            "next_cursor": page["next_cursor"],
             "filters_applied": {"genre": genre, "cluster": cluster, "limit": limit},
-            "results": filtered,
+            "results": page["results"],
         }
 
     except HTTPException:
@@ -213,6 +756,12 @@ def search_by_filters(
         raise HTTPException(500, "Error processing filtered search")
 
 
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Hit/miss counters of the query embedding and result caches"""
+    return query_cache.stats()
+
+
 @app.post("/ingest")
 async def ingest_sample(
     file: UploadFile = File(..., description="Audio file to add to database"),
@@ -222,44 +771,22 @@ async def ingest_sample(
     Ingest a new audio sample into the database.
     Processes the audio, generates embedding, assigns cluster, and stores in ChromaDB.
     """
-    content = await file.read()
-    file_size = len(content)
-
-    validate_audio_file(file.filename, file_size)
-
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=Path(file.filename).suffix
-    ) as tmp:
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
+    content = await read_upload(file)
 
     try:
-        loader = AudioLoader(str(tmp_path.parent))
-        audio_data = loader.load_audio(tmp_path)
+        try:
+            processed = await extraction_pool.run(
+                process_audio_bytes, content, file.filename, genre
+            )
+        except ExecutorSaturated as e:
+            raise_saturated(e)
 
-        if not audio_data:
+        if not processed:
             raise HTTPException(400, "Failed to load audio file")
 
-        audio_data["genre"] = genre
-
-        processed = processor.extract_features(audio_data)
-        embedding = embedder.generate_embedding(processed)
-
-        model_path = MODELS_DIR / "clusterer_kmeans.pkl"
-        if model_path.exists():
-            clusterer = AudioClusterer.load(model_path)
-            cluster_id = int(clusterer.predict([embedding])[0])
-        else:
-            cluster_id = -1
-
-        sample_id = f"sample_{storage.count() + 1}"
-
         metadata = processed["metadata"]
-        metadata["cluster"] = cluster_id
-
-        storage.add_samples(
-            embeddings=[embedding], metadata=[metadata], ids=[sample_id]
-        )
+        (sample_id,) = store_samples(processed["embedding"][None, :], [metadata])
+        cluster_id = metadata["cluster"]
 
         logger.info(f"Ingested new sample: {file.filename} (cluster: {cluster_id})")
 
@@ -269,7 +796,7 @@ async def ingest_sample(
             "sample_id": sample_id,
             "cluster": cluster_id,
             "genre": genre,
-            "total_samples": storage.count(),
+            "total_samples": stats.total,
         }
 
     except HTTPException:
@@ -277,9 +804,65 @@ async def ingest_sample(
     except Exception as e:
         logger.error(f"Error ingesting sample: {e}")
         raise HTTPException(500, f"Error ingesting sample: {str(e)}")
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink()
+
+
+@app.post("/ingest/bulk", status_code=202)
+async def ingest_bulk(
+    files: List[UploadFile] = File(
+        ..., description="Audio files and/or zip/tar archives of audio files"
+    ),
+    genre: Optional[str] = Query(
+        None,
+        description="Genre for every sample; defaults to each archive member's folder",
+    ),
+):
+    """
+    Queue many samples for ingestion and return a job id immediately.
+    Files are processed in the background in batches; poll /ingest/jobs/{job_id}.
+    """
+    job = IngestJob(INGEST_JOBS_DIR, genre)
+
+    for file in files:
+        filename = Path(file.filename or "").name
+        suffix = Path(filename).suffix.lower()
+
+        if is_archive(filename):
+            limit = MAX_BULK_UPLOAD_MB
+        elif suffix in AUDIO_EXTENSIONS:
+            limit = MAX_UPLOAD_SIZE_MB
+        else:
+            job.reject(filename, f"Unsupported file type: {suffix or filename}")
+            continue
+
+        path = job.stage_path(filename)
+        try:
+            await save_upload(file, path, limit)
+        except HTTPException as e:
+            job.reject(filename, e.detail)
+            continue
+
+        if is_archive(filename):
+            job.add_archive(path, filename)
+        else:
+            job.add_file(path, filename)
+
+    job_queue.submit(job)
+    logger.info(f"Queued ingest job {job.id} ({len(files)} uploads)")
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/ingest/jobs/{job.id}",
+    }
+
+
+@app.get("/ingest/jobs/{job_id}")
+def get_ingest_job(job_id: str):
+    """Progress, throughput and per-file errors of a bulk ingest job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown ingest job: {job_id}")
+    return job.as_dict()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 class SearchResult(BaseModel):
+    sample_id: Optional[str] = None
     filename: str
     genre: str
     distance: float = Field(
@@ -20,9 +21,43 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
 
 
+class SegmentResult(SearchResult):
+    offset: float = Field(ge=0.0, description="Start of the best window (seconds)")
+
+
+class SegmentSearchResponse(BaseModel):
+    query: QueryInfo
+    results: List[SegmentResult]
+
+
+class BatchSearchItem(BaseModel):
+    query: QueryInfo
+    results: List[SearchResult]
+    error: Optional[str] = None
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[BatchSearchItem]
+
+
+class VectorSearchRequest(BaseModel):
+    vectors: List[List[float]] = Field(min_length=1)
+    n_results: int = Field(5, ge=1, le=20)
+
+
+class VectorSearchResponse(BaseModel):
+    results: List[List[SearchResult]]
+
+
+class IdSearchRequest(BaseModel):
+    sample_ids: List[str] = Field(min_length=1)
+    n_results: int = Field(5, ge=1, le=20)
+
+
 class GenreStats(BaseModel):
     total_samples: int
     genres: Dict[str, int]
+    clusters: Dict[str, int] = {}
     embedding_dimension: int
 
 
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, max_items: int = 1024, ttl: float = 3600):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class QueryCache:
+    """
+    Two-level cache for search queries.
+
+    Uploads map by SHA-256 of their bytes to the embedding extracted from
+    them, and embeddings map to search results for a given n_results, filter
+    and collection version. The version pairs a local counter, bumped on
+    this process's writes, with `version_fn()`, read from the store on every
+    lookup so writes made by other processes also make stale results
+    unreachable.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 1024,
+        ttl: float = 3600,
+        version_fn: Optional[Callable[[], Hashable]] = None,
+    ):
+        self.embeddings = LRUCache(max_items, ttl)
+        self.results = LRUCache(max_items, ttl)
+        self.version = 0
+        self.version_fn = version_fn
+
+    @staticmethod
+    def content_key(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def result_key(
+        self, embedding: np.ndarray, n_results: int, where: Optional[Dict] = None
+    ):
+        vector = np.ascontiguousarray(embedding, dtype=np.float32)
+        return (
+            hashlib.sha256(vector.tobytes()).hexdigest(),
+            n_results,
+            json.dumps(where, sort_keys=True),
+            self.collection_version(),
+        )
+
+    def collection_version(self):
+        return self.version, self.version_fn() if self.version_fn else None
+
+    def get_embedding(self, content_key: str) -> Optional[Dict]:
+        return self.embeddings.get(content_key)
+
+    def put_embedding(self, content_key: str, embedded: Dict):
+        self.embeddings.put(content_key, embedded)
+
+    def get_results(
+        self, embedding: np.ndarray, n_results: int, where: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        return self.results.get(self.result_key(embedding, n_results, where))
+
+    def put_results(
+        self,
+        embedding: np.ndarray,
+        n_results: int,
+        results: Dict,
+        where: Optional[Dict] = None,
+    ):
+        self.results.put(self.result_key(embedding, n_results, where), results)
+
+    def bump_version(self):
+        self.version += 1
+        self.results.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "collection_version": self.collection_version(),
+            "embeddings": self.embeddings.stats(),
+            "results": self.results.stats(),
+        }
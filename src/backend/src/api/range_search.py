@@ -0,0 +1,85 @@
+import base64
+import json
+import logging
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(embedding: np.ndarray, max_distance: float, row: int) -> str:
+    """
+    Cursor carrying the query itself, so a client can follow it without
+    uploading the audio again
+    """
+    query = base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes())
+    payload = json.dumps([query.decode(), max_distance, row]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str):
+    """(embedding, max_distance, row) from encode_cursor; ValueError if malformed"""
+    try:
+        query, max_distance, row = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        embedding = np.frombuffer(base64.b64decode(query), dtype=np.float32)
+        return embedding, float(max_distance), int(row)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def stream_matches(
+    storage,
+    embedding: np.ndarray,
+    max_distance: float,
+    offset: int = 0,
+    limit: int = 1000,
+    page_size: int = 1000,
+) -> Iterator[str]:
+    """
+    NDJSON lines for up to `limit` range matches, one line per sample, then
+    a final `{"next_cursor": ..., "returned": n}` line. Matches are written
+    page by page as the store scans them, so neither side buffers the full
+    list; next_cursor is null once no matches are left.
+    """
+    returned = 0
+    next_row: Optional[int] = None
+
+    try:
+        for page in storage.range_search(
+            embedding, max_distance, offset=offset, page_size=page_size
+        ):
+            lines = []
+            for row, sample_id, meta, distance in zip(
+                page["rows"], page["ids"], page["metadatas"], page["distances"]
+            ):
+                if returned == limit:
+                    next_row = row
+                    break
+                lines.append(
+                    json.dumps(
+                        {
+                            "sample_id": sample_id,
+                            "filename": meta.get("filename"),
+                            "genre": meta.get("genre"),
+                            "distance": distance,
+                        }
+                    )
+                )
+                returned += 1
+
+            if lines:
+                yield "\n".join(lines) + "\n"
+            if next_row is not None:
+                break
+
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"Error in range search: {e}")
+        yield json.dumps({"error": "Error scanning the collection"}) + "\n"
+        return
+
+    cursor = None
+    if next_row is not None:
+        cursor = encode_cursor(embedding, max_distance, next_row)
+    yield json.dumps({"next_cursor": cursor, "returned": returned}) + "\n"
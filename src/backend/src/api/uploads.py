@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from utils.security import validate_file_content
+from utils.validators import validate_audio_file
+from config.settings import MAX_UPLOAD_SIZE_MB, MAX_BATCH_FILES, MAX_BULK_UPLOAD_MB
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Long enough for every magic number validate_file_content checks
+MAGIC_HEADER_SIZE = 12
+# Room for multipart boundaries and part headers
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Most files each upload route accepts in one request
+UPLOAD_ROUTES = {
+    "/search": 1,
+    "/search/range": 1,
+    "/search/segments": 1,
+    "/ingest": 1,
+    "/search/batch": MAX_BATCH_FILES,
+}
+
+
+def max_request_bytes(path: str, max_size_mb: int = MAX_UPLOAD_SIZE_MB):
+    """Largest body an upload route can legitimately receive, or None"""
+    if path == "/ingest/bulk":
+        return MAX_BULK_UPLOAD_MB * 1024 * 1024 + MULTIPART_OVERHEAD
+
+    files = UPLOAD_ROUTES.get(path)
+    if files is None:
+        return None
+    return files * (max_size_mb * 1024 * 1024 + MULTIPART_OVERHEAD)
+
+
+async def save_upload(
+    file: UploadFile,
+    path: Path,
+    max_size_mb: int = MAX_UPLOAD_SIZE_MB,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+):
+    """Copy an upload to disk in chunks, stopping once it passes the limit"""
+    max_bytes = max_size_mb * 1024 * 1024
+    if (file.size or 0) > max_bytes:
+        raise HTTPException(413, f"File too large. Max: {max_size_mb}MB")
+
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(413, f"File too large. Max: {max_size_mb}MB")
+                f.write(chunk)
+    except HTTPException:
+        path.unlink(missing_ok=True)
+        raise
+
+
+async def read_upload(
+    file: UploadFile,
+    max_size_mb: int = MAX_UPLOAD_SIZE_MB,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> bytes:
+    """
+    Read an audio upload in chunks, rejecting it as early as possible.
+
+    The filename and declared size are checked before any byte is read, the
+    magic number after the first chunk, and the size limit after every chunk,
+    so memory per request never exceeds the limit plus one chunk.
+    """
+    max_bytes = max_size_mb * 1024 * 1024
+    validate_audio_file(file.filename, file.size or 0, max_size_mb)
+
+    buffer = bytearray()
+    sniffed = False
+    while chunk := await file.read(chunk_size):
+        buffer += chunk
+
+        if len(buffer) > max_bytes:
+            raise HTTPException(413, f"File too large. Max: {max_size_mb}MB")
+
+        if not sniffed and len(buffer) >= MAGIC_HEADER_SIZE:
+            check_magic(buffer, file.filename)
+            sniffed = True
+
+    if not sniffed:
+        check_magic(buffer, file.filename)
+
+    return bytes(buffer)
+
+
+def check_magic(content: bytes, filename: str):
+    header = bytes(content[:MAGIC_HEADER_SIZE])
+    if not validate_file_content(header, [Path(filename).suffix.lower()]):
+        raise HTTPException(400, "File content is not a supported audio format")
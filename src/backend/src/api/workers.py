@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.ingestion.audio_loader import AudioLoader
+from src.ingestion.audio_processor import AudioProcessor
+from src.embeddings.audio_embedder import AudioEmbedder
+from config.settings import SAMPLE_RATE, N_MFCC, N_CHROMA
+
+# Created once per worker process, not per request
+_loader = AudioLoader(".", sample_rate=SAMPLE_RATE)
+_processor = AudioProcessor(n_mfcc=N_MFCC, n_chroma=N_CHROMA)
+_embedder = AudioEmbedder()
+
+
+def process_audio_bytes(
+    content: bytes, filename: str, genre: str = "unknown"
+) -> Optional[Dict]:
+    """Decode, extract and embed one upload, keeping its metadata for ingest"""
+    audio_data = _loader.load_audio_bytes(content, filename, genre)
+    if not audio_data:
+        return None
+
+    processed = _processor.extract_features(audio_data)
+    return {
+        "embedding": _embedder.generate_embedding(processed),
+        "metadata": processed["metadata"],
+        "duration": audio_data["duration"],
+    }
+
+
+def embed_audio_bytes(content: bytes, filename: str) -> Optional[Dict]:
+    """Decode, extract and embed one upload; runs inside a pool worker"""
+    processed = process_audio_bytes(content, filename)
+    if not processed:
+        return None
+
+    return {"embedding": processed["embedding"], "duration": processed["duration"]}
+
+
+def process_stored_file(path: str, filename: str, genre: str) -> Optional[Dict]:
+    """Like process_audio_bytes for a file staged on disk by a bulk ingest job"""
+    return process_audio_bytes(Path(path).read_bytes(), filename, genre)
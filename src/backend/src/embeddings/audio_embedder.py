@@ -18,14 +18,25 @@ class AudioEmbedder:
 
         return normalized
 
-    def generate_embeddings_batch(
-        self, processed_batch: List[Dict]
-    ) -> List[np.ndarray]:
-        embeddings = []
-        for processed in processed_batch:
-            embedding = self.generate_embedding(processed)
-            embeddings.append(embedding)
-        return embeddings
+    def generate_embeddings_batch(self, processed_batch: List[Dict]) -> np.ndarray:
+        """Normalize a batch of feature vectors into one (n, d) float32 matrix"""
+        if not processed_batch:
+            return np.empty((0, self.feature_dim or 0), dtype=np.float32)
+
+        features = np.stack([p["features"] for p in processed_batch])
+
+        if self.feature_dim is None:
+            self.feature_dim = features.shape[1]
+
+        return self.normalize(features)
+
+    @staticmethod
+    def normalize(features: np.ndarray) -> np.ndarray:
+        """Standardize each row of an (n, d) feature matrix, as float32"""
+        mean = features.mean(axis=1, keepdims=True)
+        std = features.std(axis=1, keepdims=True)
+
+        return ((features - mean) / (std + 1e-8)).astype(np.float32)
 
     def get_feature_dimension(self) -> int:
         return self.feature_dim
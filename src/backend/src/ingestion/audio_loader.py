@@ -1,9 +1,17 @@
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional, Iterator, Union
+import io
+import os
+import sys
 import librosa
 import soundfile as sf
 import numpy as np
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from utils.parallel import parallel_map
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac"}
+
 
 class AudioLoader:
     def __init__(self, data_dir: str, sample_rate: int = 22050):
@@ -26,29 +34,66 @@ class AudioLoader:
         except Exception as e:
             return None
 
-    def load_genre(self, genre: str) -> List[Dict]:
+    def load_audio_bytes(
+        self,
+        data: Union[bytes, BinaryIO],
+        filename: str,
+        genre: str = "unknown",
+    ) -> Optional[Dict]:
+        """Decode an in-memory upload (bytes or file-like) without touching disk"""
+        try:
+            buffer = data if hasattr(data, "read") else io.BytesIO(data)
+            audio, sr = librosa.load(buffer, sr=self.sample_rate)
+            duration = librosa.get_duration(y=audio, sr=sr)
+
+            return {
+                "audio": audio,
+                "sample_rate": sr,
+                "duration": duration,
+                "filename": filename,
+                "path": filename,
+                "genre": genre,
+            }
+        except Exception as e:
+            return None
+
+    def iter_genre_files(self, genre: str) -> Iterator[Path]:
         genre_path = self.data_dir / genre
         if not genre_path.exists():
-            return []
+            return
+
+        # One directory listing instead of a glob per extension
+        with os.scandir(genre_path) as entries:
+            for entry in entries:
+                if (
+                    entry.is_file()
+                    and Path(entry.name).suffix.lower() in AUDIO_EXTENSIONS
+                ):
+                    yield genre_path / entry.name
+
+    def iter_files(self) -> Iterator[Path]:
+        for genre_dir in self.data_dir.iterdir():
+            if genre_dir.is_dir():
+                yield from self.iter_genre_files(genre_dir.name)
 
-        audio_files = []
-        for ext in ["*.mp3", "*.wav", "*.flac"]:
-            audio_files.extend(list(genre_path.glob(ext)))
+    def find_genre_files(self, genre: str) -> List[Path]:
+        return list(self.iter_genre_files(genre))
 
+    def find_all_files(self) -> List[Path]:
+        return list(self.iter_files())
+
+    def load_files(
+        self, file_paths: List[Path], workers: int = 1, chunksize: int = 8
+    ) -> List[Dict]:
         loaded = []
-        for file_path in audio_files:
-            audio_data = self.load_audio(file_path)
+        for audio_data in parallel_map(self.load_audio, file_paths, workers, chunksize):
             if audio_data:
                 loaded.append(audio_data)
 
         return loaded
 
-    def load_all(self) -> List[Dict]:
-        all_audio = []
-
-        for genre_dir in self.data_dir.iterdir():
-            if genre_dir.is_dir():
-                audio_list = self.load_genre(genre_dir.name)
-                all_audio.extend(audio_list)
+    def load_genre(self, genre: str) -> List[Dict]:
+        return self.load_files(self.find_genre_files(genre))
 
-        return all_audio
+    def load_all(self, workers: int = 1, chunksize: int = 8) -> List[Dict]:
+        return self.load_files(self.find_all_files(), workers, chunksize)
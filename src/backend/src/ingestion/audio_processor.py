@@ -1,9 +1,11 @@
 import numpy as np
 import sys
+from functools import partial
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from utils.feature_extractors import (
+    compute_spectrogram,
     extract_mfcc,
     extract_chroma,
     extract_spectral_centroid,
@@ -12,26 +14,56 @@ from utils.feature_extractors import (
     extract_tempo,
     extract_rms,
     extract_spectral_bandwidth,
+    extract_window_features,
 )
+from utils.parallel import parallel_map
+
+
+def _extract_safe(processor, audio_data):
+    try:
+        return processor.extract_features(audio_data), None
+    except Exception as e:
+        return None, f"Error processing {audio_data['filename']}: {e}"
+
+
+def _load_and_extract_safe(processor, loader, file_path):
+    try:
+        result = processor.process_file(loader, file_path)
+    except Exception as e:
+        return None, f"Error processing {Path(file_path).name}: {e}"
+
+    if result is None:
+        return None, f"Error processing {Path(file_path).name}: failed to load audio"
+    return result, None
 
 
 class AudioProcessor:
-    def __init__(self, n_mfcc=13, n_chroma=12):
+    def __init__(self, n_mfcc=13, n_chroma=12, cache=None, segments=None):
+        """
+        `segments` is an optional (window_seconds, hop_seconds) pair; when set,
+        results also carry per-window "segments" features computed from the
+        same spectrogram, and the feature cache (which stores only whole-file
+        vectors) is written but not read.
+        """
         self.n_mfcc = n_mfcc
         self.n_chroma = n_chroma
+        self.cache = cache
+        self.segments = segments
 
     def extract_features(self, audio_data):
         audio = audio_data["audio"]
         sr = audio_data["sample_rate"]
 
-        mfcc_mean, mfcc_std = extract_mfcc(audio, sr, self.n_mfcc)
-        chroma_mean = extract_chroma(audio, sr, self.n_chroma)
-        centroid_mean, centroid_std = extract_spectral_centroid(audio, sr)
-        rolloff_mean = extract_spectral_rolloff(audio, sr)
+        spectrogram = compute_spectrogram(audio, sr)
+
+        mfcc_mean, mfcc_std = extract_mfcc(audio, sr, self.n_mfcc, spectrogram)
+        chroma_mean = extract_chroma(audio, sr, self.n_chroma, spectrogram)
+        centroid_mean, centroid_std = extract_spectral_centroid(audio, sr, spectrogram)
+        rolloff_mean = extract_spectral_rolloff(audio, sr, spectrogram)
         zcr_mean = extract_zero_crossing_rate(audio)
-        tempo = extract_tempo(audio, sr)
+        tempo = extract_tempo(audio, sr, spectrogram)
         rms_mean = extract_rms(audio)
-        bandwidth_mean = extract_spectral_bandwidth(audio, sr)
+        bandwidth_mean = extract_spectral_bandwidth(audio, sr, spectrogram)
 
         feature_vector = np.concatenate(
             [
@@ -48,7 +80,7 @@ class AudioProcessor:
             ]
         )
 
-        return {
+        result = {
             "features": feature_vector,
             "metadata": {
                 "filename": audio_data["filename"],
@@ -58,12 +90,81 @@ class AudioProcessor:
             },
         }
 
-    def process_batch(self, audio_list):
+        if self.segments:
+            window_seconds, hop_seconds = self.segments
+            result["segments"] = extract_window_features(
+                audio,
+                sr,
+                window_seconds,
+                hop_seconds,
+                self.n_mfcc,
+                self.n_chroma,
+                spectrogram,
+            )
+
+        return result
+
+    def process_file(self, loader, file_path):
+        """Extract features for a file on disk, consulting the feature cache first"""
+        file_path = Path(file_path)
+
+        content_hash = None
+        if self.cache is not None:
+            content_hash = self.cache.hash_file(file_path)
+            cached = None if self.segments else self.cache.get(content_hash)
+            if cached is not None:
+                return {
+                    "features": cached["features"],
+                    "metadata": {
+                        "filename": file_path.name,
+                        "genre": file_path.parent.name,
+                        "duration": cached["duration"],
+                        "path": str(file_path),
+                    },
+                    "content_hash": content_hash,
+                }
+
+        audio_data = loader.load_audio(file_path)
+        if not audio_data:
+            return None
+
+        result = self.extract_features(audio_data)
+
+        if self.cache is not None:
+            self.cache.put(content_hash, result["features"], audio_data["duration"])
+            result["content_hash"] = content_hash
+
+        return result
+
+    def _collect(self, outcomes):
         processed = []
-        for audio_data in audio_list:
-            try:
-                result = self.extract_features(audio_data)
+        for result, error in outcomes:
+            if error:
+                print(error)
+            else:
                 processed.append(result)
-            except Exception as e:
-                print(f"Error processing {audio_data['filename']}: {e}")
         return processed
+
+    def process_batch(self, audio_list, workers=1, chunksize=8):
+        outcomes = parallel_map(
+            partial(_extract_safe, self), audio_list, workers, chunksize
+        )
+        return self._collect(outcomes)
+
+    def iter_files(self, file_paths, loader, workers=1, chunksize=8):
+        """Lazily decode and extract features for each file; waveforms are not kept"""
+        outcomes = parallel_map(
+            partial(_load_and_extract_safe, self, loader),
+            file_paths,
+            workers,
+            chunksize,
+        )
+        for result, error in outcomes:
+            if error:
+                print(error)
+            else:
+                yield result
+
+    def process_files(self, file_paths, loader, workers=1, chunksize=8):
+        """Decode and extract features for each file, in a process pool if workers > 1"""
+        return list(self.iter_files(file_paths, loader, workers, chunksize))
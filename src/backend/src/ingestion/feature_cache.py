@@ -0,0 +1,106 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+# Bump when feature extraction changes in a way that alters the vectors.
+FEATURE_VERSION = 1
+
+
+def hash_file(file_path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Persistent feature store keyed by file content hash.
+
+    Entries live under a directory named after the feature-config version, so
+    changing SAMPLE_RATE, N_MFCC, N_CHROMA or FEATURE_VERSION starts a fresh
+    namespace and `evict` removes the stale ones. Least-recently-used entries
+    are evicted once the cache exceeds `max_size_mb`.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        sample_rate: int = 22050,
+        n_mfcc: int = 13,
+        n_chroma: int = 12,
+        max_size_mb: int = 512,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_size_mb * 1024 * 1024
+
+        config = f"{FEATURE_VERSION}:{sample_rate}:{n_mfcc}:{n_chroma}"
+        self.version = hashlib.sha1(config.encode()).hexdigest()[:12]
+        self.version_dir = self.cache_dir / self.version
+
+    hash_file = staticmethod(hash_file)
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.version_dir / content_hash[:2] / f"{content_hash}.npz"
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        path = self._entry_path(content_hash)
+        try:
+            with np.load(path) as data:
+                entry = {
+                    "features": data["features"],
+                    "duration": float(data["duration"]),
+                }
+            os.utime(path)
+            return entry
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(self, content_hash: str, features: np.ndarray, duration: float):
+        path = self._entry_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, features=features, duration=duration)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, content_hash: Optional[str] = None):
+        """Remove one entry, or the whole cache when no hash is given"""
+        if content_hash is None:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        else:
+            self._entry_path(content_hash).unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Drop stale config versions and LRU entries beyond max size"""
+        if not self.cache_dir.exists():
+            return 0
+
+        for version_dir in self.cache_dir.iterdir():
+            if version_dir.is_dir() and version_dir != self.version_dir:
+                shutil.rmtree(version_dir, ignore_errors=True)
+
+        entries = []
+        total = 0
+        for path in self.version_dir.glob("*/*.npz"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        return removed
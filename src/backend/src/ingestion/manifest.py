@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.ingestion.feature_cache import hash_file
+
+
+class FileManifest:
+    """
+    Record of every ingested file: size, mtime, content hash and sample id.
+
+    `diff` compares a fresh scan against the manifest. Files whose size and
+    mtime are unchanged are trusted without being read; only files whose
+    stat changed are re-hashed to tell real edits from touched timestamps.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+        self.next_id = 0
+        self.load()
+
+    def reset(self):
+        self.entries = {}
+        self.next_id = 0
+
+    def load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r") as f:
+            data = json.load(f)
+
+        self.entries = data.get("files", {})
+        self.next_id = data.get("next_id", 0)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"next_id": self.next_id, "files": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def diff(self, file_paths: Iterable[Path], full: bool = False) -> Dict:
+        """
+        Split scanned files into new, changed, deleted and unchanged.
+
+        With `full=True` every known file is reported as changed so it is
+        re-processed under its existing sample id.
+        """
+        new: List[Path] = []
+        changed: List[Path] = []
+        unchanged = 0
+        seen = set()
+
+        for file_path in file_paths:
+            key = str(file_path)
+            seen.add(key)
+            entry = self.entries.get(key)
+
+            if entry is None:
+                new.append(file_path)
+                continue
+
+            if full:
+                changed.append(file_path)
+                continue
+
+            stat = file_path.stat()
+            if stat.st_size == entry["size"] and stat.st_mtime == entry["mtime"]:
+                unchanged += 1
+                continue
+
+            content_hash = hash_file(file_path)
+            if content_hash == entry["hash"]:
+                entry["size"] = stat.st_size
+                entry["mtime"] = stat.st_mtime
+                unchanged += 1
+            else:
+                changed.append(file_path)
+
+        deleted = [key for key in self.entries if key not in seen]
+
+        return {
+            "new": new,
+            "changed": changed,
+            "deleted": deleted,
+            "unchanged": unchanged,
+        }
+
+    def assign_id(self, file_path) -> str:
+        entry = self.entries.get(str(file_path))
+        if entry is not None:
+            return entry["sample_id"]
+
+        sample_id = f"sample_{self.next_id}"
+        self.next_id += 1
+        return sample_id
+
+    def record(self, file_path, sample_id: str, content_hash: Optional[str] = None):
+        file_path = Path(file_path)
+        stat = file_path.stat()
+
+        self.entries[str(file_path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "hash": content_hash or hash_file(file_path),
+            "sample_id": sample_id,
+        }
+
+    def remove(self, key: str) -> Optional[str]:
+        entry = self.entries.pop(key, None)
+        return entry["sample_id"] if entry else None
@@ -0,0 +1,66 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def stream_ingest(
+    processed: Iterable[Dict],
+    embedder,
+    storage,
+    batch_size: int = 256,
+    start_id: int = 0,
+    on_batch: Optional[Callable[[int], None]] = None,
+    assign_id: Optional[Callable[[Dict], str]] = None,
+    on_commit: Optional[Callable[[List[Dict], List[str]], None]] = None,
+    upsert: bool = False,
+    before_commit: Optional[Callable[[List[Dict], List[str]], None]] = None,
+) -> Dict:
+    """
+    Embed processed samples and store them in fixed-size batches.
+
+    `processed` is consumed lazily (e.g. from AudioProcessor.iter_files), so
+    at most one batch of feature vectors is held in memory at a time. Ids are
+    sequential from `start_id` unless `assign_id` is given; `before_commit` and
+    `on_commit` are called with each batch and its ids just before and just
+    after the batch is stored.
+    """
+    total = 0
+    genres: Dict[str, int] = {}
+
+    for batch in iter_batches(processed, batch_size):
+        embeddings = embedder.generate_embeddings_batch(batch)
+        metadata = [p["metadata"] for p in batch]
+        if assign_id:
+            ids = [assign_id(p) for p in batch]
+        else:
+            ids = [f"sample_{start_id + total + i}" for i in range(len(batch))]
+
+        if before_commit:
+            before_commit(batch, ids)
+
+        if upsert:
+            storage.upsert_samples(embeddings, metadata, ids)
+        else:
+            storage.add_samples(embeddings, metadata, ids)
+
+        if on_commit:
+            on_commit(batch, ids)
+
+        total += len(batch)
+        for meta in metadata:
+            genres[meta["genre"]] = genres.get(meta["genre"], 0) + 1
+
+        if on_batch:
+            on_batch(total)
+
+    return {"total": total, "genres": genres}
@@ -2,8 +2,12 @@ import numpy as np
 from sklearn.cluster import KMeans, DBSCAN
 from sklearn.metrics import silhouette_score, davies_bouldin_score
 import joblib
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from utils.atomic import atomic_path
+
 
 class AudioClusterer:
     def __init__(self, method="kmeans", n_clusters=6):
@@ -43,22 +47,23 @@ class AudioClusterer:
             raise NotImplementedError("DBSCAN doesn't support predict")
 
     def save(self, filepath):
-        """Save model to disk"""
-        joblib.dump(
-            {
-                "model": self.model,
-                "labels": self.labels,
-                "metrics": self.metrics,
-                "method": self.method,
-                "n_clusters": self.n_clusters,
-            },
-            filepath,
-        )
+        """Save model to disk, replacing any previous file atomically"""
+        with atomic_path(filepath) as tmp_path:
+            joblib.dump(
+                {
+                    "model": self.model,
+                    "labels": self.labels,
+                    "metrics": self.metrics,
+                    "method": self.method,
+                    "n_clusters": self.n_clusters,
+                },
+                tmp_path,
+            )
 
     @classmethod
-    def load(cls, filepath):
-        """Load model from disk"""
-        data = joblib.load(filepath)
+    def load(cls, filepath, mmap_mode=None):
+        """Load model from disk; mmap_mode="r" memory-maps its numpy arrays"""
+        data = joblib.load(filepath, mmap_mode=mmap_mode)
         clusterer = cls(method=data["method"], n_clusters=data["n_clusters"])
         clusterer.model = data["model"]
         clusterer.labels = data["labels"]
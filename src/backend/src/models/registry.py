@@ -0,0 +1,68 @@
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.models.clustering import AudioClusterer
+
+
+class ClustererRegistry:
+    """
+    The saved KMeans clusterer, loaded once per process and hot-swapped.
+
+    The model is loaded with joblib memory-mapping, so the centroid arrays of
+    every worker on the host share page-cached pages. Each `assign` checks
+    the file signature and, if `analyze_clusters.py` has written a new model,
+    loads it and replaces the (clusterer, centroids) pair in one assignment.
+    Without a KMeans model every sample is assigned cluster -1.
+    """
+
+    def __init__(self, model_path):
+        self.model_path = Path(model_path)
+        self.version = None
+        self._current = (None, None)
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        try:
+            stat = self.model_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        signature = self._signature()
+        if signature == self.version:
+            return
+
+        with self._lock:
+            if signature == self.version:
+                return
+
+            clusterer, centroids = None, None
+            if signature is not None:
+                clusterer = AudioClusterer.load(self.model_path, mmap_mode="r")
+                if clusterer.method == "kmeans":
+                    centroids = np.asarray(clusterer.model.cluster_centers_)
+
+            self._current = (clusterer, centroids)
+            self.version = signature
+
+    @property
+    def clusterer(self) -> Optional[AudioClusterer]:
+        self.refresh()
+        return self._current[0]
+
+    def assign(self, embedding) -> int:
+        """Id of the nearest centroid, or -1 when no KMeans model is saved"""
+        self.refresh()
+        centroids = self._current[1]
+        if centroids is None:
+            return -1
+
+        embedding = np.asarray(embedding, dtype=centroids.dtype)
+        distances = np.einsum("ij,ij->i", centroids - embedding, centroids - embedding)
+        return int(distances.argmin())
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from config.settings import (
+    VECTOR_BACKEND,
+    CHROMA_COLLECTION,
+    CHROMA_DB_DIR,
+    CHROMA_WRITE_CONCURRENCY,
+    LOCAL_INDEX_DIR,
+    CLUSTERER_PATH,
+    IVF_NPROBE,
+)
+
+
+def create_storage(
+    backend: str = VECTOR_BACKEND, collection_name: str = CHROMA_COLLECTION
+):
+    """Build the configured vector store; all backends share ChromaStorage's interface"""
+    if backend == "chroma":
+        from src.storage.chroma_client import ChromaStorage
+
+        return ChromaStorage(
+            collection_name=collection_name,
+            persist_directory=str(CHROMA_DB_DIR),
+            write_concurrency=CHROMA_WRITE_CONCURRENCY,
+        )
+
+    if backend == "local":
+        from src.storage.local_index import LocalVectorStorage
+
+        return LocalVectorStorage(
+            collection_name=collection_name, persist_directory=str(LOCAL_INDEX_DIR)
+        )
+
+    if backend == "ivf":
+        from src.storage.ivf_index import IVFVectorStorage
+
+        return IVFVectorStorage(
+            collection_name=collection_name,
+            persist_directory=str(LOCAL_INDEX_DIR),
+            centroids_path=str(CLUSTERER_PATH),
+            nprobe=IVF_NPROBE,
+        )
+
+    raise ValueError(f"Unknown storage backend: {backend}")
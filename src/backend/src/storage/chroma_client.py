@@ -1,7 +1,20 @@
 import chromadb
-from typing import List, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional
 import numpy as np
 import os
+import time
+
+from src.storage.local_index import cosine_distances
+
+# Chroma's limit when the client cannot report it (SQLite variable cap)
+DEFAULT_MAX_BATCH_SIZE = 5461
+
+
+def _to_lists(embeddings) -> List[List[float]]:
+    # One C-level conversion for the whole (n, d) matrix instead of one per row
+    return np.asarray(embeddings, dtype=np.float32).tolist()
 
 
 class ChromaStorage:
@@ -9,16 +22,24 @@ class ChromaStorage:
         self,
         collection_name: str = "audio_samples",
         persist_directory: str = "./chroma_db",
+        write_concurrency: int = 1,
+        max_retries: int = 3,
     ):
         self.collection_name = collection_name
+        self.max_retries = max_retries
 
         chroma_host = os.getenv("CHROMA_HOST", "localhost")
         chroma_port = os.getenv("CHROMA_PORT", "8000")
 
         if chroma_host == "chromadb":
             self.client = chromadb.HttpClient(host=chroma_host, port=str(chroma_port))
+            self.write_concurrency = max(1, write_concurrency)
         else:
+            # The embedded client serializes writes on SQLite anyway
             self.client = chromadb.PersistentClient(path=persist_directory)
+            self.write_concurrency = 1
+
+        self.max_batch_size = self._max_batch_size()
 
         try:
             self.collection = self.client.get_or_create_collection(
@@ -29,21 +50,193 @@ class ChromaStorage:
             print(f"Error creating collection: {e}")
             raise
 
+    def _max_batch_size(self) -> int:
+        getter = getattr(self.client, "get_max_batch_size", None)
+        if getter is not None:
+            try:
+                return int(getter())
+            except Exception:
+                pass
+        return int(getattr(self.client, "max_batch_size", DEFAULT_MAX_BATCH_SIZE))
+
+    def _write_chunk(self, embeddings, metadata: List[Dict], ids: List[str], upsert):
+        # Lists are built per chunk, never for the whole input at once
+        embeddings_list = _to_lists(embeddings)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                # A retried chunk may have partly landed, so retries upsert
+                if upsert or attempt > 0:
+                    self.collection.upsert(embeddings=embeddings_list, metadatas=metadata, ids=ids)  # type: ignore[arg-type]
+                else:
+                    self.collection.add(embeddings=embeddings_list, metadatas=metadata, ids=ids)  # type: ignore[arg-type]
+                return len(ids)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(0.5 * 2**attempt)
+
+    def _write(
+        self,
+        embeddings: np.ndarray,
+        metadata: List[Dict],
+        ids: List[str],
+        upsert: bool,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Write in chunks of the backend's max batch size. With an HTTP client
+        and write_concurrency > 1, up to two chunks per thread are in flight.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        total = len(ids)
+        step = self.max_batch_size
+
+        def write(start):
+            end = start + step
+            return self._write_chunk(
+                embeddings[start:end], metadata[start:end], ids[start:end], upsert
+            )
+
+        written = 0
+
+        def done(count):
+            nonlocal written
+            written += count
+            if on_progress:
+                on_progress(written, total)
+
+        if self.write_concurrency == 1:
+            for start in range(0, total, step):
+                done(write(start))
+            return
+
+        with ThreadPoolExecutor(max_workers=self.write_concurrency) as pool:
+            in_flight = deque()
+            for start in range(0, total, step):
+                in_flight.append(pool.submit(write, start))
+                if len(in_flight) >= 2 * self.write_concurrency:
+                    done(in_flight.popleft().result())
+            while in_flight:
+                done(in_flight.popleft().result())
+
     def add_samples(
-        self, embeddings: List[np.ndarray], metadata: List[Dict], ids: List[str]
+        self,
+        embeddings: np.ndarray,
+        metadata: List[Dict],
+        ids: List[str],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self._write(embeddings, metadata, ids, upsert=False, on_progress=on_progress)
+
+    def upsert_samples(
+        self,
+        embeddings: np.ndarray,
+        metadata: List[Dict],
+        ids: List[str],
+        on_progress: Optional[Callable[[int, int], None]] = None,
     ):
-        embeddings_list = [emb.tolist() for emb in embeddings]
+        self._write(embeddings, metadata, ids, upsert=True, on_progress=on_progress)
 
-        self.collection.add(embeddings=embeddings_list, metadatas=metadata, ids=ids)  # type: ignore[arg-type]
+    def delete_samples(self, ids: List[str]):
+        if ids:
+            self.collection.delete(ids=ids)
 
-    def search_similar(self, query_embedding: np.ndarray, n_results: int = 5) -> Dict:
+    def search_similar(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+    ) -> Dict:
+        return self.search_similar_batch(query_embedding[None, :], n_results, where)
+
+    def search_similar_batch(
+        self,
+        query_embeddings: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Query many vectors in one round trip; results are lists per query.
+        `where` is applied by Chroma before ranking, not to the top hits.
+        """
         results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()], n_results=n_results
+            query_embeddings=_to_lists(np.atleast_2d(query_embeddings)),
+            n_results=n_results,
+            where=where or None,
         )
         return results  # type: ignore[return-value]
 
+    def get_samples(self, ids: List[str], include_embeddings: bool = False) -> Dict:
+        """Ids and metadata (optionally float32 embeddings) of the ids that exist"""
+        if not ids:
+            samples = {"ids": [], "metadatas": []}
+            if include_embeddings:
+                samples["embeddings"] = np.empty((0, 0), dtype=np.float32)
+            return samples
+
+        include = ["embeddings", "metadatas"] if include_embeddings else ["metadatas"]
+        page = self.collection.get(ids=ids, include=include)  # type: ignore[arg-type]
+        samples = {"ids": page["ids"], "metadatas": page["metadatas"]}
+        if include_embeddings:
+            samples["embeddings"] = np.asarray(page["embeddings"], dtype=np.float32)
+        return samples
+
     def get_all_samples(self) -> Dict:
         return self.collection.get(include=["embeddings", "metadatas"])  # type: ignore[return-value]
 
+    def iter_samples(
+        self, page_size: int = 1000, include_embeddings: bool = True, offset: int = 0
+    ) -> Iterator[Dict]:
+        """
+        Page through the collection with limit/offset. Each page holds its ids,
+        metadata and, if requested, a float32 (n, d) embedding block.
+        """
+        include = ["embeddings", "metadatas"] if include_embeddings else ["metadatas"]
+        while True:
+            page = self.collection.get(limit=page_size, offset=offset, include=include)  # type: ignore[arg-type]
+            if not page["ids"]:
+                return
+
+            block = {"ids": page["ids"], "metadatas": page["metadatas"]}
+            if include_embeddings:
+                block["embeddings"] = np.asarray(page["embeddings"], dtype=np.float32)
+            yield block
+
+            offset += len(page["ids"])
+            if len(page["ids"]) < page_size:
+                return
+
+    def range_search(
+        self,
+        query_embedding: np.ndarray,
+        max_distance: float,
+        offset: int = 0,
+        page_size: int = 1000,
+    ) -> Iterator[Dict]:
+        """
+        Every sample within `max_distance` cosine distance of the query, from
+        row `offset` on. Chroma has no range query, so this is a vectorised
+        scan over iter_samples pages yielding each page's matches.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        row = offset
+        for page in self.iter_samples(page_size=page_size, offset=offset):
+            block = page["embeddings"]
+            norms = np.einsum("ij,ij->i", block, block)
+            distances = cosine_distances(query, block, norms)
+            hits = np.flatnonzero(distances <= max_distance)
+            yield {
+                "rows": (row + hits).tolist(),
+                "ids": [page["ids"][i] for i in hits],
+                "metadatas": [page["metadatas"][i] for i in hits],
+                "distances": distances[hits].tolist(),
+            }
+            row += len(page["ids"])
+
     def count(self) -> int:
         return self.collection.count()
+
+    def version(self) -> int:
+        """Sample count; Chroma exposes no write counter, so updates in place keep it"""
+        return self.collection.count()
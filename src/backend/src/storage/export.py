@@ -0,0 +1,56 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def load_samples(
+    storage, mmap_path: Optional[str] = None, page_size: int = 1000
+) -> Dict:
+    """
+    Assemble the whole collection page by page into one float32 matrix.
+
+    The matrix is allocated once from `storage.count()` (or created as a
+    `.npy` memory map at `mmap_path`), and each page is copied straight into
+    its rows, so the corpus is never held as Python lists or twice in RAM.
+    Returns the same keys as `get_all_samples`.
+    """
+    expected = storage.count()
+    ids, metadatas = [], []
+    embeddings = None
+    filled = 0
+
+    for page in storage.iter_samples(page_size=page_size):
+        block = page["embeddings"]
+        if embeddings is None:
+            embeddings = _allocate((expected, block.shape[1]), mmap_path)
+
+        # Rows added after count() was taken are left for the next run
+        block = block[: expected - filled]
+        embeddings[filled : filled + len(block)] = block
+        ids.extend(page["ids"][: len(block)])
+        metadatas.extend(page["metadatas"][: len(block)])
+        filled += len(block)
+        if filled == expected:
+            break
+
+    if embeddings is None:
+        embeddings = np.empty((0, 0), dtype=np.float32)
+    elif filled < expected:
+        # Rows deleted while paging
+        embeddings = embeddings[:filled]
+
+    if isinstance(embeddings, np.memmap):
+        embeddings.flush()
+
+    return {"ids": ids, "embeddings": embeddings, "metadatas": metadatas}
+
+
+def _allocate(shape, mmap_path: Optional[str]):
+    if mmap_path is None:
+        return np.empty(shape, dtype=np.float32)
+
+    Path(mmap_path).parent.mkdir(parents=True, exist_ok=True)
+    return np.lib.format.open_memmap(
+        mmap_path, mode="w+", dtype=np.float32, shape=shape
+    )
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+RANGE_OPERATORS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def build_where(
+    genre: Optional[str] = None,
+    cluster: Optional[int] = None,
+    min_duration: Optional[float] = None,
+    max_duration: Optional[float] = None,
+    is_anomaly: Optional[bool] = None,
+) -> Optional[Dict]:
+    """Chroma `where` clause for the given predicates, or None for no filter"""
+    conditions: List[Dict] = []
+    if genre is not None:
+        conditions.append({"genre": genre})
+    if cluster is not None:
+        conditions.append({"cluster": cluster})
+    if min_duration is not None:
+        conditions.append({"duration": {"$gte": min_duration}})
+    if max_duration is not None:
+        conditions.append({"duration": {"$lte": max_duration}})
+    if is_anomaly is not None:
+        conditions.append({"is_anomaly": is_anomaly})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+class MetadataColumns:
+    """
+    Columnar view of a metadata list for evaluating `where` clauses.
+
+    A field is split into typed arrays (numbers, booleans, other values) the
+    first time a clause touches it, so later filters are vectorised
+    comparisons yielding a boolean row mask. Covers what `build_where`
+    emits: equality, `$gt`/`$gte`/`$lt`/`$lte` and `$and`. As in Chroma,
+    values only match operands of the same type and missing fields never
+    match.
+    """
+
+    def __init__(self, metadatas: List[Dict]):
+        self.metadatas = metadatas
+        self._columns: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def __len__(self):
+        return len(self.metadatas)
+
+    def column(self, field: str) -> Dict[str, np.ndarray]:
+        if field not in self._columns:
+            values = [meta.get(field) for meta in self.metadatas]
+            numbers = np.full(len(values), np.nan)
+            flags = np.full(len(values), -1, dtype=np.int8)
+            others = np.empty(len(values), dtype=object)
+
+            for row, value in enumerate(values):
+                if isinstance(value, bool):
+                    flags[row] = value
+                elif isinstance(value, (int, float)):
+                    numbers[row] = value
+                else:
+                    others[row] = value
+
+            self._columns[field] = {
+                "numbers": numbers,
+                "flags": flags,
+                "others": others,
+            }
+        return self._columns[field]
+
+    def mask(self, where: Optional[Dict]) -> np.ndarray:
+        masks = [np.ones(len(self), dtype=bool)]
+        for key, condition in (where or {}).items():
+            if key == "$and":
+                masks.extend(self.mask(clause) for clause in condition)
+            else:
+                masks.append(self._field_mask(key, condition))
+        return np.logical_and.reduce(masks)
+
+    def _field_mask(self, field: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        column = self.column(field)
+        masks = []
+        for operator, operand in condition.items():
+            if operator in RANGE_OPERATORS:
+                with np.errstate(invalid="ignore"):
+                    masks.append(RANGE_OPERATORS[operator](column["numbers"], operand))
+            elif operator != "$eq":
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            elif isinstance(operand, bool):
+                masks.append(column["flags"] == operand)
+            elif isinstance(operand, (int, float)):
+                masks.append(column["numbers"] == operand)
+            else:
+                masks.append(column["others"] == operand)
+        return np.logical_and.reduce(masks)
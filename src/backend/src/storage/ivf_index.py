@@ -0,0 +1,248 @@
+import hashlib
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.models.clustering import AudioClusterer
+from src.storage.local_index import LocalVectorStorage, squared_l2, top_k
+from utils.atomic import atomic_path
+
+
+def load_centroids(model_path) -> Optional[np.ndarray]:
+    """KMeans centroids from a saved AudioClusterer, or None if unavailable"""
+    model_path = Path(model_path)
+    if not model_path.exists():
+        return None
+
+    clusterer = AudioClusterer.load(model_path)
+    if clusterer.method != "kmeans":
+        return None
+
+    return np.asarray(clusterer.model.cluster_centers_, dtype=np.float32)
+
+
+def assign_lists(
+    embeddings: np.ndarray, centroids: np.ndarray, block_size: int = 65536
+) -> np.ndarray:
+    """Nearest-centroid id for every row, computed in bounded-memory blocks"""
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(embeddings), dtype=np.int32)
+
+    for start in range(0, len(embeddings), block_size):
+        block = np.asarray(embeddings[start : start + block_size], dtype=np.float32)
+        distances = squared_l2(block, centroids, centroid_norms)
+        assignments[start : start + len(block)] = distances.argmin(axis=1)
+
+    return assignments
+
+
+class IVFVectorStorage(LocalVectorStorage):
+    """
+    Approximate search over the local index using KMeans as a coarse quantizer.
+
+    Every stored vector is filed in the inverted list of its nearest centroid
+    from the saved clusterer. A query scans only the `nprobe` lists whose
+    centroids are closest, widening the probe if they hold fewer than
+    `n_results` vectors. List assignments are persisted per generation and
+    reused for unchanged rows, so ingest only assigns the new vectors. When
+    the clusterer file changes, lists are rebuilt on the next call; without
+    a KMeans model the backend falls back to exact search.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "audio_samples",
+        persist_directory: str = "./local_index",
+        centroids_path: str = "./models/saved/clusterer_kmeans.pkl",
+        nprobe: int = 2,
+    ):
+        self.centroids_path = Path(centroids_path)
+        self.nprobe = nprobe
+        self._load_centroids()
+        super().__init__(collection_name, persist_directory)
+
+    def _centroids_mtime(self):
+        try:
+            return self.centroids_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_centroids(self):
+        self._centroids_version = self._centroids_mtime()
+        self.centroids = load_centroids(self.centroids_path)
+        self.centroids_key = (
+            hashlib.sha1(self.centroids.tobytes()).hexdigest()[:12]
+            if self.centroids is not None
+            else ""
+        )
+
+    def _lists_path(self, generation: int) -> Path:
+        return self.directory / f"{self.collection_name}.{generation}.ivf.npz"
+
+    def _before_swap(self, generation: int, embeddings: np.ndarray, ids: List[str]):
+        if self.centroids is None:
+            return
+
+        assignments = np.full(len(ids), -1, dtype=np.int32)
+
+        # Reuse the list of every row whose id and vector are unchanged
+        if self.assignments is not None and len(self.ids):
+            old_rows = np.array([self.id_to_row.get(i, -1) for i in ids])
+            known = np.flatnonzero(old_rows >= 0)
+            same = np.all(embeddings[known] == self.embeddings[old_rows[known]], axis=1)
+            assignments[known[same]] = self.assignments[old_rows[known[same]]]
+
+        pending = np.flatnonzero(assignments < 0)
+        if len(pending):
+            assignments[pending] = assign_lists(embeddings[pending], self.centroids)
+
+        with atomic_path(self._lists_path(generation)) as tmp_path:
+            np.savez(
+                tmp_path, assignments=assignments, centroids_key=self.centroids_key
+            )
+
+    def _after_load(self, generation: int):
+        self.assignments = None
+        self.lists = None
+        self.radii = None
+        if self.centroids is None:
+            return
+
+        assignments = None
+        try:
+            with np.load(self._lists_path(generation)) as data:
+                if str(data["centroids_key"]) == self.centroids_key:
+                    assignments = data["assignments"]
+        except (OSError, KeyError):
+            pass
+
+        if assignments is None or len(assignments) != len(self.ids):
+            assignments = assign_lists(self.embeddings, self.centroids)
+
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(self.centroids) + 1))
+
+        self.assignments = assignments
+        self.lists = [order[bounds[c] : bounds[c + 1]] for c in range(len(bounds) - 1)]
+        self.radii = self._angular_radii()
+
+    def _angular_radii(self) -> np.ndarray:
+        """Largest angle between each centroid and a vector in its list"""
+        directions = self.centroids / np.maximum(
+            np.linalg.norm(self.centroids, axis=1, keepdims=True), 1e-12
+        )
+        radii = np.full(len(self.lists), -np.inf)
+        for cluster, rows in enumerate(self.lists):
+            if len(rows):
+                cosines = self.embeddings[rows] @ directions[cluster]
+                cosines /= np.maximum(np.sqrt(self.norms[rows]), 1e-12)
+                radii[cluster] = np.arccos(np.clip(cosines.min(), -1.0, 1.0))
+        return radii
+
+    def _range_scan(self, query: np.ndarray, max_distance: float):
+        """
+        Skip every list whose angular radius around its centroid cannot reach
+        the query's range; by the triangle inequality on angles, no member
+        of such a list is within `max_distance` cosine distance.
+        """
+        snapshot = self._ivf_snapshot()
+        embeddings, norms, ids, metadatas, _, centroids, lists, radii = snapshot
+        if lists is None:
+            return super()._range_scan(query, max_distance)
+
+        centroid_norms = np.linalg.norm(centroids, axis=1)
+        cosines = (centroids @ query) / np.maximum(
+            centroid_norms * np.linalg.norm(query), 1e-12
+        )
+        angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+        reach = np.arccos(np.clip(1.0 - max_distance, -1.0, 1.0))
+
+        probed = np.flatnonzero(angles - radii <= reach + 1e-6)
+        rows = np.concatenate([lists[c] for c in probed] + [np.empty(0, np.int64)])
+        return embeddings, norms, ids, metadatas, np.sort(rows)
+
+    def _refresh(self):
+        if self._centroids_mtime() != self._centroids_version:
+            with self._lock:
+                self._load_centroids()
+                self._load()
+        super()._refresh()
+
+    def _ivf_snapshot(self):
+        self._refresh()
+        with self._lock:
+            return (
+                self.embeddings,
+                self.norms,
+                self.ids,
+                self.metadatas,
+                self.columns,
+                self.centroids,
+                self.lists,
+                self.radii,
+            )
+
+    def _probe(
+        self, lists, probe_order, n_results: int, nprobe: int, mask=None
+    ) -> np.ndarray:
+        """Rows of the closest lists, widened until n_results rows pass `mask`"""
+        probed = []
+        found = 0
+        for rank, cluster in enumerate(probe_order):
+            if rank >= nprobe and found >= n_results:
+                break
+            rows = lists[cluster]
+            if mask is not None:
+                rows = rows[mask[rows]]
+            probed.append(rows)
+            found += len(rows)
+
+        return np.concatenate(probed)
+
+    def search_similar_batch(
+        self,
+        query_embeddings: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        nprobe: Optional[int] = None,
+    ) -> Dict:
+        snapshot = self._ivf_snapshot()
+        embeddings, norms, ids, metadatas, columns, centroids, lists, _ = snapshot
+        if lists is None or len(ids) == 0:
+            return super().search_similar_batch(query_embeddings, n_results, where)
+
+        mask = columns.mask(where) if where else None
+
+        nprobe = nprobe or self.nprobe
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        probe_orders = squared_l2(queries, centroids, centroid_norms).argsort(axis=1)
+
+        results = {"ids": [], "metadatas": [], "distances": []}
+        for query, probe_order in zip(queries, probe_orders):
+            candidates = self._probe(lists, probe_order, n_results, nprobe, mask)
+            distances = squared_l2(
+                query[None, :], embeddings[candidates], norms[candidates]
+            )
+            best = top_k(distances, n_results)[0]
+            rows = candidates[best]
+
+            results["ids"].append([ids[i] for i in rows])
+            results["metadatas"].append([metadatas[i] for i in rows])
+            results["distances"].append(distances[0, best].tolist())
+
+        return results
+
+    def search_similar(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        nprobe: Optional[int] = None,
+    ) -> Dict:
+        return self.search_similar_batch(
+            query_embedding[None, :], n_results, where, nprobe
+        )
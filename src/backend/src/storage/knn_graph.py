@@ -0,0 +1,295 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.storage.export import load_samples
+from src.storage.local_index import squared_l2, top_k
+from utils.atomic import atomic_path
+
+
+def knn_search(
+    queries: np.ndarray,
+    query_rows: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    corpus_rows: Optional[np.ndarray] = None,
+    block_size: int = 1024,
+    n_threads: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact k nearest corpus rows for every query, in (block x block) tiles.
+
+    Query blocks run on a thread pool (the matrix products release the GIL)
+    and each keeps a running top-k while it walks the corpus blocks, so memory
+    stays at one tile per thread whatever the corpus size. A query never
+    matches the corpus row with its own number. Returns (rows, distances);
+    rows are numbered by `corpus_rows` and short lists are padded with -1/inf.
+    """
+    corpus = np.ascontiguousarray(corpus, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    query_rows = np.asarray(query_rows, dtype=np.int64)
+    if corpus_rows is None:
+        corpus_rows = np.arange(len(corpus), dtype=np.int64)
+    norms = np.einsum("ij,ij->i", corpus, corpus)
+
+    def search_block(start):
+        block = queries[start : start + block_size]
+        block_rows = query_rows[start : start + block_size]
+        best_rows = np.full((len(block), k), -1, dtype=np.int64)
+        best = np.full((len(block), k), np.inf, dtype=np.float32)
+
+        for corpus_start in range(0, len(corpus), block_size):
+            end = corpus_start + block_size
+            rows = corpus_rows[corpus_start:end]
+            distances = squared_l2(
+                block, corpus[corpus_start:end], norms[corpus_start:end]
+            )
+            distances[block_rows[:, None] == rows[None, :]] = np.inf
+
+            local = top_k(distances, k)
+            best_rows, best = merge_top_k(
+                best_rows,
+                best,
+                rows[local],
+                np.take_along_axis(distances, local, axis=1),
+                k,
+            )
+        return best_rows, best
+
+    starts = range(0, len(queries), block_size)
+    with ThreadPoolExecutor(max_workers=n_threads or os.cpu_count() or 1) as pool:
+        blocks = list(pool.map(search_block, starts))
+
+    if not blocks:
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+    return np.vstack([b[0] for b in blocks]), np.vstack([b[1] for b in blocks])
+
+
+def merge_top_k(rows_a, distances_a, rows_b, distances_b, k):
+    """Row-wise k best of two candidate lists; unfilled slots become -1/inf"""
+    rows = np.concatenate([rows_a, rows_b], axis=1)
+    distances = np.concatenate([distances_a, distances_b], axis=1)
+    best = top_k(distances, k)
+
+    rows = np.take_along_axis(rows, best, axis=1)
+    distances = np.take_along_axis(distances, best, axis=1)
+    rows[np.isinf(distances)] = -1
+    return rows, distances
+
+
+class KnnGraph:
+    """
+    Top-k neighbour lists for every stored sample.
+
+    `neighbors` is an (n, k) int32 matrix of row numbers into `ids` and
+    `distances` the matching float16 squared L2 distances (ascending); rows
+    with fewer than k other samples are padded with -1/inf. Looking up a
+    sample is a dict hit plus one row slice.
+    """
+
+    def __init__(self, ids: List[str], neighbors: np.ndarray, distances: np.ndarray):
+        self.ids = list(ids)
+        self.neighbors = neighbors
+        self.distances = distances
+        self.id_to_row = {sample_id: row for row, sample_id in enumerate(self.ids)}
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        ids: List[str],
+        k: int = 20,
+        block_size: int = 1024,
+        n_threads: Optional[int] = None,
+    ) -> "KnnGraph":
+        rows = np.arange(len(ids))
+        neighbors, distances = knn_search(
+            embeddings, rows, embeddings, k, block_size=block_size, n_threads=n_threads
+        )
+        return cls(ids, neighbors.astype(np.int32), distances.astype(np.float16))
+
+    def update(
+        self,
+        embeddings: np.ndarray,
+        ids: List[str],
+        changed: Iterable[str] = (),
+        block_size: int = 1024,
+        n_threads: Optional[int] = None,
+    ) -> "KnnGraph":
+        """
+        Graph for the collection now holding `ids`/`embeddings`.
+
+        Ids not in this graph, and `changed` ids whose embedding was
+        re-written, get fresh lists. Surviving rows only search the fresh
+        rows and merge them into their lists, unless one of their neighbours
+        was removed or changed, in which case they are searched again.
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        changed = set(changed)
+        k = self.k
+        new_id_to_row = {sample_id: row for row, sample_id in enumerate(ids)}
+
+        # Old row -> new row; the extra last slot maps padding (-1) to -1
+        remap = np.full(len(self.ids) + 1, -1, dtype=np.int64)
+        for old_row, sample_id in enumerate(self.ids):
+            if sample_id not in changed:
+                remap[old_row] = new_id_to_row.get(sample_id, -1)
+
+        kept_old = np.flatnonzero(remap[:-1] >= 0)
+        kept_new = remap[kept_old]
+
+        neighbors = np.full((len(ids), k), -1, dtype=np.int64)
+        distances = np.full((len(ids), k), np.inf, dtype=np.float32)
+        neighbors[kept_new] = remap[self.neighbors[kept_old]]
+        distances[kept_new] = self.distances[kept_old]
+
+        fresh = np.ones(len(ids), dtype=bool)
+        fresh[kept_new] = False
+        lost = (neighbors[kept_new] < 0) & (self.neighbors[kept_old] >= 0)
+        dirty = fresh.copy()
+        dirty[kept_new[lost.any(axis=1)]] = True
+
+        dirty_rows = np.flatnonzero(dirty)
+        if len(dirty_rows):
+            neighbors[dirty_rows], distances[dirty_rows] = knn_search(
+                embeddings[dirty_rows],
+                dirty_rows,
+                embeddings,
+                k,
+                block_size=block_size,
+                n_threads=n_threads,
+            )
+
+        fresh_rows = np.flatnonzero(fresh)
+        clean_rows = np.flatnonzero(~dirty)
+        if len(fresh_rows) and len(clean_rows):
+            candidates, candidate_distances = knn_search(
+                embeddings[clean_rows],
+                clean_rows,
+                embeddings[fresh_rows],
+                k,
+                corpus_rows=fresh_rows,
+                block_size=block_size,
+                n_threads=n_threads,
+            )
+            neighbors[clean_rows], distances[clean_rows] = merge_top_k(
+                neighbors[clean_rows],
+                distances[clean_rows],
+                candidates,
+                candidate_distances,
+                k,
+            )
+
+        return KnnGraph(ids, neighbors.astype(np.int32), distances.astype(np.float16))
+
+    def neighbours(self, sample_id: str, n: Optional[int] = None):
+        """(ids, distances) of the n nearest samples, or None for unknown ids"""
+        row = self.id_to_row.get(sample_id)
+        if row is None:
+            return None
+
+        rows = self.neighbors[row, :n]
+        rows = rows[rows >= 0]
+        return (
+            [self.ids[r] for r in rows],
+            self.distances[row, : len(rows)].astype(np.float32).tolist(),
+        )
+
+    def mean_distances(self) -> np.ndarray:
+        """Mean distance to each sample's neighbours, a kNN outlier score"""
+        distances = self.distances.astype(np.float32)
+        valid = np.isfinite(distances)
+        totals = np.where(valid, distances, 0.0).sum(axis=1)
+        return totals / np.maximum(valid.sum(axis=1), 1)
+
+    def save(self, path):
+        with atomic_path(path) as tmp_path:
+            np.savez(
+                tmp_path,
+                ids=np.array(self.ids, dtype=str),
+                neighbors=self.neighbors,
+                distances=self.distances,
+            )
+
+    @classmethod
+    def load(cls, path) -> "KnnGraph":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["ids"].tolist(), data["neighbors"], data["distances"])
+
+
+class KnnGraphStore:
+    """
+    The saved graph, loaded once per process and reloaded when
+    `build_knn_graph.py` replaces the file. `graph` is None until it exists.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.version = None
+        self._graph = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @property
+    def graph(self) -> Optional[KnnGraph]:
+        signature = self._signature()
+        if signature != self.version:
+            with self._lock:
+                if signature != self.version:
+                    self._graph = KnnGraph.load(self.path) if signature else None
+                    self.version = signature
+        return self._graph
+
+
+def refresh_knn_graph(
+    storage,
+    path,
+    k: int = 20,
+    changed: Iterable[str] = (),
+    full: bool = False,
+    block_size: int = 1024,
+    n_threads: Optional[int] = None,
+) -> KnnGraph:
+    """Build the graph at `path` from storage, or update the one already there"""
+    samples = load_samples(storage)
+    path = Path(path)
+
+    if not full and path.exists():
+        graph = KnnGraph.load(path)
+        if graph.k == k:
+            graph = graph.update(
+                samples["embeddings"],
+                samples["ids"],
+                changed=changed,
+                block_size=block_size,
+                n_threads=n_threads,
+            )
+            graph.save(path)
+            return graph
+
+    graph = KnnGraph.build(
+        samples["embeddings"],
+        samples["ids"],
+        k=k,
+        block_size=block_size,
+        n_threads=n_threads,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    graph.save(path)
+    return graph
@@ -0,0 +1,356 @@
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.storage.filters import MetadataColumns
+from utils.atomic import atomic_path, file_lock
+
+
+def squared_l2(queries: np.ndarray, embeddings: np.ndarray, norms: np.ndarray):
+    """Squared L2 distances (Chroma's default space) via one matrix product"""
+    query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+    distances = query_norms + norms[None, :] - 2.0 * (queries @ embeddings.T)
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def cosine_distances(query: np.ndarray, embeddings: np.ndarray, norms: np.ndarray):
+    """1 - cosine similarity of one query to each row; `norms` are squared"""
+    scale = np.sqrt(norms) * np.sqrt(query @ query)
+    return 1.0 - (embeddings @ query) / np.maximum(scale, 1e-12)
+
+
+def top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k smallest distances per row, sorted ascending"""
+    k = min(k, distances.shape[1])
+    if k == 0:
+        return np.empty((distances.shape[0], 0), dtype=np.int64)
+
+    if k < distances.shape[1]:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(distances.shape[1]), (distances.shape[0], 1))
+
+    order = np.take_along_axis(distances, candidates, axis=1).argsort(axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class LocalVectorStorage:
+    """
+    In-process exact search backend with the same interface as ChromaStorage.
+
+    Embeddings live in a float32 `.npy` file opened with mmap, so every API
+    worker on the host shares one page-cached copy; ids and metadata live in a
+    JSON sidecar. Each write produces a new generation of both files and then
+    atomically repoints `<collection>.current`, so readers in other processes
+    never see a half-written pair and pick up changes on their next call.
+    Writers hold `<collection>.lock` from re-reading the current generation
+    until the new one is live, so concurrent writers in separate processes
+    apply their changes one after another instead of overwriting each other.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "audio_samples",
+        persist_directory: str = "./local_index",
+    ):
+        self.collection_name = collection_name
+        self.directory = Path(persist_directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pointer_path = self.directory / f"{collection_name}.current"
+        self.lock_path = self.directory / f"{collection_name}.lock"
+
+        self._lock = threading.Lock()
+        self._generation = None
+        self._load()
+
+    def _paths(self, generation: int):
+        prefix = f"{self.collection_name}.{generation}"
+        return self.directory / f"{prefix}.npy", self.directory / f"{prefix}.json"
+
+    def _generation_files(self, generation: int) -> List[Path]:
+        return list(self.directory.glob(f"{self.collection_name}.{generation}.*"))
+
+    def _current_generation(self) -> int:
+        try:
+            return int(self.pointer_path.read_text().strip())
+        except (OSError, ValueError):
+            return 0
+
+    def _load(self):
+        # Retry if a writer swaps generations between reading the pointer
+        # and opening the files it names
+        for _ in range(3):
+            generation = self._current_generation()
+            if not generation:
+                self.embeddings = np.empty((0, 0), dtype=np.float32)
+                self.ids = []
+                self.metadatas = []
+                break
+
+            embeddings_path, metadata_path = self._paths(generation)
+            try:
+                self.embeddings = np.load(embeddings_path, mmap_mode="r")
+                with open(metadata_path, "r") as f:
+                    sidecar = json.load(f)
+            except FileNotFoundError:
+                continue
+
+            self.ids = sidecar["ids"]
+            self.metadatas = sidecar["metadatas"]
+            break
+        else:
+            raise FileNotFoundError(f"Index files for {self.pointer_path} are missing")
+
+        self.norms = np.einsum("ij,ij->i", self.embeddings, self.embeddings)
+        self.columns = MetadataColumns(self.metadatas)
+        self.id_to_row = {sample_id: i for i, sample_id in enumerate(self.ids)}
+        self._generation = generation
+        self._after_load(generation)
+
+    def _after_load(self, generation: int):
+        """Hook for subclasses that keep derived structures per generation"""
+
+    def _before_swap(self, generation: int, embeddings: np.ndarray, ids: List[str]):
+        """Hook for subclasses to write extra files before a generation goes live"""
+
+    def _refresh(self):
+        if self._current_generation() != self._generation:
+            with self._lock:
+                self._refresh_locked()
+
+    def _refresh_locked(self):
+        if self._current_generation() != self._generation:
+            self._load()
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialise read-modify-write cycles across threads and processes"""
+        with self._lock, file_lock(self.lock_path):
+            self._refresh_locked()
+            yield
+
+    def _snapshot(self):
+        """Consistent (embeddings, norms, ids, metadatas, columns) for one read"""
+        self._refresh()
+        with self._lock:
+            return self.embeddings, self.norms, self.ids, self.metadatas, self.columns
+
+    def _write(self, embeddings: np.ndarray, ids: List[str], metadatas: List[Dict]):
+        generation = max(self._current_generation(), self._generation or 0) + 1
+        embeddings_path, metadata_path = self._paths(generation)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        with atomic_path(embeddings_path) as tmp_path:
+            np.save(tmp_path, embeddings)
+        with atomic_path(metadata_path) as tmp_path:
+            with open(tmp_path, "w") as f:
+                json.dump({"ids": ids, "metadatas": metadatas}, f)
+        self._before_swap(generation, embeddings, ids)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(str(generation))
+        os.replace(tmp_path, self.pointer_path)
+
+        previous = self._generation
+        self._load()
+
+        # Open memory maps in other processes keep the old inode alive
+        if previous:
+            for path in self._generation_files(previous):
+                path.unlink(missing_ok=True)
+
+    def _merge(
+        self,
+        embeddings,
+        metadata: List[Dict],
+        ids: List[str],
+        replace: bool,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        duplicates = sorted(i for i, n in Counter(ids).items() if n > 1)
+        if duplicates:
+            raise ValueError(
+                f"Expected IDs to be unique, found duplicates of: {duplicates}"
+            )
+
+        with self._write_lock():
+            current = np.array(self.embeddings)
+            if current.size == 0:
+                current = current.reshape(0, embeddings.shape[1])
+            all_ids = list(self.ids)
+            all_metadatas = list(self.metadatas)
+
+            new_rows = []
+            for row, (sample_id, meta) in enumerate(zip(ids, metadata)):
+                existing = self.id_to_row.get(sample_id)
+                if existing is None:
+                    new_rows.append(row)
+                    all_ids.append(sample_id)
+                    all_metadatas.append(meta)
+                elif replace:
+                    current[existing] = embeddings[row]
+                    all_metadatas[existing] = meta
+
+            merged = np.concatenate([current, embeddings[new_rows]])
+            self._write(merged, all_ids, all_metadatas)
+
+        if on_progress:
+            on_progress(len(ids), len(ids))
+
+    def add_samples(
+        self,
+        embeddings: np.ndarray,
+        metadata: List[Dict],
+        ids: List[str],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """Add new samples; ids that already exist are ignored, as in Chroma"""
+        self._merge(embeddings, metadata, ids, replace=False, on_progress=on_progress)
+
+    def upsert_samples(
+        self,
+        embeddings: np.ndarray,
+        metadata: List[Dict],
+        ids: List[str],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self._merge(embeddings, metadata, ids, replace=True, on_progress=on_progress)
+
+    def delete_samples(self, ids: List[str]):
+        if not ids:
+            return
+
+        with self._write_lock():
+            remove = {self.id_to_row[i] for i in ids if i in self.id_to_row}
+            if not remove:
+                return
+
+            keep = [row for row in range(len(self.ids)) if row not in remove]
+            self._write(
+                self.embeddings[keep],
+                [self.ids[row] for row in keep],
+                [self.metadatas[row] for row in keep],
+            )
+
+    def search_similar_batch(
+        self,
+        query_embeddings: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Exact nearest neighbours; `where` (Chroma syntax) masks the rows
+        before ranking, so every query gets n_results matches if that many exist
+        """
+        embeddings, norms, ids, metadatas, columns = self._snapshot()
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+
+        candidates = None
+        if where:
+            candidates = np.flatnonzero(columns.mask(where))
+            embeddings, norms = embeddings[candidates], norms[candidates]
+
+        if len(embeddings) == 0:
+            empty = [[] for _ in range(len(queries))]
+            return {"ids": empty, "metadatas": empty, "distances": empty}
+
+        distances = squared_l2(queries, embeddings, norms)
+        best = top_k(distances, n_results)
+        rows = candidates[best] if candidates is not None else best
+
+        return {
+            "ids": [[ids[i] for i in query_rows] for query_rows in rows],
+            "metadatas": [[metadatas[i] for i in query_rows] for query_rows in rows],
+            "distances": np.take_along_axis(distances, best, axis=1).tolist(),
+        }
+
+    def search_similar(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+    ) -> Dict:
+        return self.search_similar_batch(query_embedding[None, :], n_results, where)
+
+    def _range_scan(self, query: np.ndarray, max_distance: float):
+        """Snapshot plus the rows that may lie within range, in row order"""
+        embeddings, norms, ids, metadatas, _ = self._snapshot()
+        return embeddings, norms, ids, metadatas, np.arange(len(ids))
+
+    def range_search(
+        self,
+        query_embedding: np.ndarray,
+        max_distance: float,
+        offset: int = 0,
+        page_size: int = 1000,
+    ) -> Iterator[Dict]:
+        """
+        Every sample within `max_distance` cosine distance of the query, from
+        row `offset` on, in row order. Scans page_size rows at a time and
+        yields each page's matches with their row numbers.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        embeddings, norms, ids, metadatas, rows = self._range_scan(query, max_distance)
+        rows = rows[rows >= offset]
+
+        for start in range(0, len(rows), page_size):
+            block = rows[start : start + page_size]
+            distances = cosine_distances(query, embeddings[block], norms[block])
+            hits = np.flatnonzero(distances <= max_distance)
+            yield {
+                "rows": block[hits].tolist(),
+                "ids": [ids[row] for row in block[hits]],
+                "metadatas": [metadatas[row] for row in block[hits]],
+                "distances": distances[hits].tolist(),
+            }
+
+    def get_samples(self, ids: List[str], include_embeddings: bool = False) -> Dict:
+        """Ids and metadata (optionally float32 embeddings) of the ids that exist"""
+        self._refresh()
+        with self._lock:
+            rows = [self.id_to_row[i] for i in ids if i in self.id_to_row]
+            samples = {
+                "ids": [self.ids[row] for row in rows],
+                "metadatas": [self.metadatas[row] for row in rows],
+            }
+            if include_embeddings:
+                samples["embeddings"] = np.asarray(
+                    self.embeddings[rows], dtype=np.float32
+                )
+            return samples
+
+    def get_all_samples(self) -> Dict:
+        embeddings, _, ids, metadatas, _ = self._snapshot()
+        return {
+            "ids": list(ids),
+            "embeddings": np.array(embeddings),
+            "metadatas": list(metadatas),
+        }
+
+    def iter_samples(
+        self, page_size: int = 1000, include_embeddings: bool = True
+    ) -> Iterator[Dict]:
+        """Pages of one snapshot; embedding blocks are views of the memory map"""
+        embeddings, _, ids, metadatas, _ = self._snapshot()
+        for start in range(0, len(ids), page_size):
+            end = start + page_size
+            block = {"ids": ids[start:end], "metadatas": metadatas[start:end]}
+            if include_embeddings:
+                block["embeddings"] = embeddings[start:end]
+            yield block
+
+    def count(self) -> int:
+        return len(self._snapshot()[2])
+
+    def version(self) -> int:
+        """Current generation; moves on every write by any process"""
+        return self._current_generation()
@@ -0,0 +1,140 @@
+import base64
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class ArtifactCache:
+    """
+    A JSON artifact parsed once per process and re-parsed only when the file
+    is replaced, detected by its (mtime_ns, size) signature on each access.
+    """
+
+    def __init__(self, path, parse: Callable[[Any], Any] = lambda data: data):
+        self.path = Path(path)
+        self.parse = parse
+        self.version = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        stat = self.path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        """Parsed artifact; raises FileNotFoundError if it has not been written"""
+        signature = self._signature()
+        if signature != self.version:
+            with self._lock:
+                if signature != self.version:
+                    with open(self.path, "r") as f:
+                        self._value = self.parse(json.load(f))
+                    self.version = signature
+        return self._value
+
+
+class MetadataIndex:
+    """
+    Sample metadata with inverted indexes by genre and cluster.
+
+    Each index maps a value to the sorted row numbers holding it, so a filter
+    costs O(matches) and combining filters is a sorted-array intersection.
+    """
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self.genres = _invert(r.get("genre") for r in records)
+        self.clusters = _invert(r.get("cluster") for r in records)
+        self.all_rows = np.arange(len(records), dtype=np.int64)
+
+    def filter(self, genre: Optional[str] = None, cluster: Optional[int] = None):
+        empty = np.empty(0, dtype=np.int64)
+        rows = self.all_rows
+
+        if genre is not None:
+            rows = self.genres.get(genre, empty)
+
+        if cluster is not None:
+            cluster_rows = self.clusters.get(cluster, empty)
+            if genre is None:
+                rows = cluster_rows
+            else:
+                rows = np.intersect1d(rows, cluster_rows, assume_unique=True)
+
+        return rows
+
+
+def _invert(values) -> Dict[Any, np.ndarray]:
+    rows: Dict[Any, List[int]] = {}
+    for row, value in enumerate(values):
+        if value is not None:
+            rows.setdefault(value, []).append(row)
+    return {value: np.array(r, dtype=np.int64) for value, r in rows.items()}
+
+
+class MetadataStore:
+    """
+    Per-process view of the clustering artifacts written by
+    scripts/analyze_clusters.py, reloaded whenever a file is rewritten.
+    """
+
+    def __init__(self, metadata_path, clusters_path):
+        self.metadata = ArtifactCache(metadata_path, MetadataIndex)
+        self.clusters = ArtifactCache(clusters_path)
+
+    def get_clusters(self) -> Dict:
+        return self.clusters.get()
+
+    def search(
+        self,
+        genre: Optional[str] = None,
+        cluster: Optional[int] = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """
+        One page of matching records.
+
+        `cursor` continues after the last row of a previous page and takes
+        precedence over `offset`. Cursors are bound to the artifact version
+        they were issued for; using one after a reload raises ValueError.
+        """
+        index = self.metadata.get()
+        rows = index.filter(genre, cluster)
+
+        if cursor:
+            version, last_row = _decode_cursor(cursor)
+            if version != list(self.metadata.version):
+                raise ValueError("Cursor is stale; the metadata has been rebuilt")
+            start = int(np.searchsorted(rows, last_row, side="right"))
+        else:
+            start = offset
+
+        page = rows[start : start + limit]
+        next_cursor = None
+        if start + limit < len(rows):
+            next_cursor = _encode_cursor(self.metadata.version, int(page[-1]))
+
+        return {
+            "total_matches": len(rows),
+            "offset": start,
+            "next_cursor": next_cursor,
+            "results": [index.records[row] for row in page],
+        }
+
+
+def _encode_cursor(version, last_row: int) -> str:
+    payload = json.dumps([list(version), last_row]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        version, last_row = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return version, int(last_row)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
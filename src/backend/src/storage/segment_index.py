@@ -0,0 +1,198 @@
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.storage.local_index import squared_l2, top_k
+
+
+class SegmentIndex:
+    """
+    Embeddings of fixed-length overlapping windows of every sample, used to
+    locate a short clip inside longer files.
+
+    Window vectors are float16 in a memory-mapped `.npy` file, with the
+    windows of each sample stored contiguously. A `.npz` sidecar holds the
+    sample ids, the first window row of each sample, the window norms and
+    the window/hop lengths; window i of a sample starts at i * hop_seconds.
+    Writes produce a new generation and repoint `<name>.current`, as in
+    LocalVectorStorage, so readers in other processes pick them up safely.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str = "./segments",
+        window_seconds: float = 2.0,
+        hop_seconds: float = 0.5,
+        name: str = "audio_segments",
+    ):
+        self.name = name
+        self.directory = Path(persist_directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pointer_path = self.directory / f"{name}.current"
+        self.default_config = (window_seconds, hop_seconds)
+
+        self._lock = threading.Lock()
+        self._generation = None
+        self._load()
+
+    def _paths(self, generation: int):
+        prefix = f"{self.name}.{generation}"
+        return self.directory / f"{prefix}.npy", self.directory / f"{prefix}.npz"
+
+    def _current_generation(self) -> int:
+        try:
+            return int(self.pointer_path.read_text().strip())
+        except (OSError, ValueError):
+            return 0
+
+    def _load(self):
+        for _ in range(3):
+            generation = self._current_generation()
+            if not generation:
+                self.windows = np.empty((0, 0), dtype=np.float16)
+                self.norms = np.empty(0, dtype=np.float32)
+                self.starts = np.zeros(1, dtype=np.int64)
+                self.sample_ids = []
+                self.window_seconds, self.hop_seconds = self.default_config
+                break
+
+            windows_path, sidecar_path = self._paths(generation)
+            try:
+                self.windows = np.load(windows_path, mmap_mode="r")
+                with np.load(sidecar_path, allow_pickle=False) as sidecar:
+                    self.norms = sidecar["norms"]
+                    self.starts = sidecar["starts"]
+                    self.sample_ids = sidecar["sample_ids"].tolist()
+                    self.window_seconds = float(sidecar["window_seconds"])
+                    self.hop_seconds = float(sidecar["hop_seconds"])
+            except FileNotFoundError:
+                continue
+            break
+        else:
+            raise FileNotFoundError(f"Index files for {self.pointer_path} are missing")
+
+        self.id_to_sample = {
+            sample_id: i for i, sample_id in enumerate(self.sample_ids)
+        }
+        self._generation = generation
+
+    def _refresh_locked(self):
+        if self._current_generation() != self._generation:
+            self._load()
+
+    def _snapshot(self):
+        if self._current_generation() != self._generation:
+            with self._lock:
+                self._refresh_locked()
+        with self._lock:
+            return (
+                self.windows,
+                self.norms,
+                self.starts,
+                self.sample_ids,
+                self.hop_seconds,
+            )
+
+    def _rewrite(self, drop: List[str], ids: List[str], windows: List[np.ndarray]):
+        """Drop the windows of `drop`, then append `windows` for `ids`"""
+        keep = np.ones(len(self.sample_ids), dtype=bool)
+        for sample_id in drop:
+            sample = self.id_to_sample.get(sample_id)
+            if sample is not None:
+                keep[sample] = False
+
+        counts = np.diff(self.starts)
+        kept = self.windows[np.repeat(keep, counts)]
+        new = [np.asarray(w, dtype=np.float16) for w in windows]
+        if len(kept) == 0 and new:
+            kept = kept.reshape(0, new[0].shape[1])
+
+        all_windows = np.concatenate([kept] + new)
+        all_counts = np.concatenate([counts[keep], [len(w) for w in new]])
+        sample_ids = [i for i, k in zip(self.sample_ids, keep) if k] + list(ids)
+
+        norms = np.empty(len(all_windows), dtype=np.float32)
+        for start in range(0, len(all_windows), 65536):
+            block = all_windows[start : start + 65536].astype(np.float32)
+            norms[start : start + len(block)] = np.einsum("ij,ij->i", block, block)
+
+        generation = max(self._current_generation(), self._generation or 0) + 1
+        windows_path, sidecar_path = self._paths(generation)
+        np.save(windows_path, all_windows)
+        np.savez(
+            sidecar_path,
+            sample_ids=np.array(sample_ids, dtype=str),
+            starts=np.concatenate([[0], np.cumsum(all_counts)]).astype(np.int64),
+            norms=norms,
+            window_seconds=self.window_seconds,
+            hop_seconds=self.hop_seconds,
+        )
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(str(generation))
+        os.replace(tmp_path, self.pointer_path)
+
+        previous = self._generation
+        self._load()
+        if previous:
+            for path in self._paths(previous):
+                path.unlink(missing_ok=True)
+
+    def upsert(self, ids: List[str], windows: List[np.ndarray]):
+        """Replace the windows of each sample id; samples without windows are skipped"""
+        pairs = [(i, w) for i, w in zip(ids, windows) if len(w)]
+        if not pairs:
+            return
+
+        with self._lock:
+            self._refresh_locked()
+            self._rewrite(
+                [i for i, _ in pairs], [i for i, _ in pairs], [w for _, w in pairs]
+            )
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            self._refresh_locked()
+            if any(i in self.id_to_sample for i in ids):
+                self._rewrite(ids, [], [])
+
+    def search(
+        self, query_embedding: np.ndarray, n_results: int = 5, block_size: int = 65536
+    ) -> List[Dict]:
+        """
+        The n_results samples holding the windows closest to the query, each
+        with the start time (seconds) and squared L2 distance of its best window
+        """
+        windows, norms, starts, sample_ids, hop_seconds = self._snapshot()
+        if not sample_ids:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)[None, :]
+        distances = np.empty(len(windows), dtype=np.float32)
+        for start in range(0, len(windows), block_size):
+            block = np.asarray(windows[start : start + block_size], dtype=np.float32)
+            end = start + len(block)
+            distances[start:end] = squared_l2(query, block, norms[start:end])[0]
+
+        best = np.minimum.reduceat(distances, starts[:-1])
+        results = []
+        for sample in top_k(best[None, :], n_results)[0]:
+            window = int(np.argmin(distances[starts[sample] : starts[sample + 1]]))
+            results.append(
+                {
+                    "sample_id": sample_ids[sample],
+                    "offset": window * hop_seconds,
+                    "distance": float(best[sample]),
+                }
+            )
+        return results
+
+    def count(self) -> int:
+        return len(self._snapshot()[3])
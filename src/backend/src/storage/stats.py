@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from utils.atomic import file_lock
+
+
+class CollectionStats:
+    """
+    Aggregate counters for a collection, kept next to it on disk.
+
+    Writers call `add`/`remove` with the metadata they store or delete inside
+    `update()`, so reading the totals never scans the collection. `update`
+    holds a lock file across reload, change and save, so concurrent writers
+    in other processes never overwrite each other's counts. Readers see
+    updates through `refresh`, which reloads the file when its mtime moves.
+    `rebuild` recomputes everything from storage if the counters drift.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self._lock = threading.RLock()
+        self._mtime = None
+        self.reset()
+        self.load()
+
+    def reset(self):
+        self.total = 0
+        self.genres: Dict[str, int] = {}
+        self.clusters: Dict[str, int] = {}
+        self.embedding_dimension = 0
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r") as f:
+            data = json.load(f)
+
+        self.total = data.get("total", 0)
+        self.genres = data.get("genres", {})
+        self.clusters = data.get("clusters", {})
+        self.embedding_dimension = data.get("embedding_dimension", 0)
+        self._mtime = self.path.stat().st_mtime
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.as_dict(), f)
+        os.replace(tmp_path, self.path)
+        self._mtime = self.path.stat().st_mtime
+
+    def refresh(self):
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+
+        if mtime != self._mtime:
+            with self._lock:
+                self.load()
+
+    @contextmanager
+    def update(self):
+        """Reload the saved counters, apply the caller's changes, then save"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.lock_path):
+            self.load()
+            try:
+                yield self
+            except BaseException:
+                # Drop the half-applied changes
+                self.reset()
+                self.load()
+                raise
+            self.save()
+
+    def sync(self, storage):
+        """Pick up saved counters, or build them once if none exist yet"""
+        if self.exists():
+            self.refresh()
+        else:
+            self.rebuild(storage)
+
+    def _count(self, metadatas: Iterable[Dict], step: int):
+        for meta in metadatas:
+            self.total += step
+            _bump(self.genres, meta.get("genre"), step)
+            if meta.get("cluster") is not None:
+                _bump(self.clusters, str(meta["cluster"]), step)
+
+    def add(self, metadatas: Iterable[Dict], embedding_dimension: Optional[int] = None):
+        with self._lock:
+            self._count(metadatas, 1)
+            if embedding_dimension:
+                self.embedding_dimension = int(embedding_dimension)
+
+    def remove(self, metadatas: Iterable[Dict]):
+        with self._lock:
+            self._count(metadatas, -1)
+            if self.total <= 0:
+                self.reset()
+
+    def rebuild(self, storage):
+        with self.update():
+            self.reset()
+            for page in storage.iter_samples():
+                self._count(page["metadatas"], 1)
+                self.embedding_dimension = page["embeddings"].shape[1]
+
+    def as_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "genres": dict(self.genres),
+            "clusters": dict(self.clusters),
+            "embedding_dimension": self.embedding_dimension,
+        }
+
+
+def _bump(counts: Dict[str, int], key, step: int):
+    if key is None:
+        return
+
+    counts[key] = counts.get(key, 0) + step
+    if counts[key] <= 0:
+        del counts[key]
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Group-commit front end for a storage backend's `add_samples`.
+
+    Inserts are appended (and fsynced) to a local JSON-lines log, which is
+    when they count as acknowledged, and buffered in memory. The buffer goes
+    to the backend as one batched `add_samples` once it holds `max_items`
+    samples or its oldest sample is `max_delay` seconds old; the log is then
+    truncated. On start-up, samples left in the log by a crash are replayed
+    with `upsert_samples`. Every other call is passed straight to the
+    wrapped storage, so searches see buffered samples only after a flush.
+    """
+
+    def __init__(
+        self,
+        storage,
+        log_path,
+        max_items: int = 256,
+        max_delay: float = 1.0,
+        on_flush: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.storage = storage
+        self.log_path = Path(log_path)
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.on_flush = on_flush
+
+        self._pending: List[Dict] = []
+        self._oldest = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.recover()
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def start(self):
+        """Start the background thread that enforces `max_delay`"""
+        if self._flusher is None:
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run, daemon=True)
+            self._flusher.start()
+
+    def close(self):
+        """Stop the flusher thread and write out everything still buffered"""
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(min(self.max_delay, 0.1)):
+            oldest = self._oldest
+            if oldest is not None and time.monotonic() - oldest >= self.max_delay:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Write-behind flush failed, will retry: {e}")
+
+    def recover(self) -> int:
+        """Replay samples acknowledged before a crash; returns how many"""
+        records = self._read_log()
+        if records:
+            self._write(records, upsert=True)
+            logger.info(
+                f"Replayed {len(records)} unflushed samples from {self.log_path}"
+            )
+        self.log_path.unlink(missing_ok=True)
+        return len(records)
+
+    def _read_log(self) -> List[Dict]:
+        if not self.log_path.exists():
+            return []
+
+        records = []
+        with open(self.log_path, "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append was never acked
+                    break
+        return records
+
+    def add_samples(self, embeddings: np.ndarray, metadata: List[Dict], ids: List[str]):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        records = [
+            {"id": sample_id, "embedding": embedding, "metadata": meta}
+            for sample_id, embedding, meta in zip(ids, embeddings.tolist(), metadata)
+        ]
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+
+        with self._lock:
+            with open(self.log_path, "a") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._pending.extend(records)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+            if len(self._pending) >= self.max_items:
+                self.flush()
+
+    def flush(self) -> int:
+        """Write the buffer to storage in one batch; returns samples written"""
+        with self._lock:
+            if not self._pending:
+                return 0
+
+            batch = self._pending
+            self._write(batch, upsert=False)
+
+            self._pending = []
+            self._oldest = None
+            self.log_path.unlink(missing_ok=True)
+
+        if self.on_flush:
+            self.on_flush([record["id"] for record in batch])
+        return len(batch)
+
+    def _write(self, records: List[Dict], upsert: bool):
+        embeddings = np.array([r["embedding"] for r in records], dtype=np.float32)
+        metadata = [r["metadata"] for r in records]
+        ids = [r["id"] for r in records]
+
+        if upsert:
+            self.storage.upsert_samples(embeddings, metadata, ids)
+        else:
+            self.storage.add_samples(embeddings, metadata, ids)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def count(self) -> int:
+        return self.storage.count() + self.pending
@@ -45,3 +45,17 @@ def test_generate_embeddings_batch(embedder):
 def test_get_feature_dimension(embedder, processed_audio):
     embedder.generate_embedding(processed_audio)
     assert embedder.get_feature_dimension() == 45
+
+
+def test_generate_embeddings_batch_matches_single(embedder):
+    batch = [
+        {"features": np.random.randn(45), "metadata": {"filename": f"test{i}.mp3"}}
+        for i in range(5)
+    ]
+
+    embeddings = embedder.generate_embeddings_batch(batch)
+    assert embeddings.shape == (5, 45)
+    assert embeddings.dtype == np.float32
+
+    expected = np.stack([embedder.generate_embedding(p) for p in batch])
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,41 @@
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.ingestion.audio_loader import AudioLoader
+
+
+@pytest.fixture
+def wav_bytes():
+    buffer = io.BytesIO()
+    audio = (np.random.randn(22050) * 0.1).astype(np.float32)
+    sf.write(buffer, audio, 22050, format="WAV")
+    return buffer.getvalue()
+
+
+def test_load_audio_bytes_matches_path(tmp_path, wav_bytes):
+    path = tmp_path / "techno" / "kick.wav"
+    path.parent.mkdir()
+    path.write_bytes(wav_bytes)
+
+    loader = AudioLoader(str(tmp_path))
+    from_path = loader.load_audio(path)
+    from_bytes = loader.load_audio_bytes(wav_bytes, "kick.wav", "techno")
+    from_file = loader.load_audio_bytes(io.BytesIO(wav_bytes), "kick.wav", "techno")
+
+    np.testing.assert_array_equal(from_bytes["audio"], from_path["audio"])
+    np.testing.assert_array_equal(from_file["audio"], from_path["audio"])
+    assert from_bytes["duration"] == from_path["duration"]
+    assert from_bytes["filename"] == "kick.wav"
+    assert from_bytes["genre"] == "techno"
+
+
+def test_load_audio_bytes_invalid():
+    loader = AudioLoader(".")
+    assert loader.load_audio_bytes(b"RIFFjunk", "bad.wav") is None
@@ -5,6 +5,16 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 from src.ingestion.audio_processor import AudioProcessor
+from utils.feature_extractors import (
+    extract_mfcc,
+    extract_chroma,
+    extract_spectral_centroid,
+    extract_spectral_rolloff,
+    extract_zero_crossing_rate,
+    extract_tempo,
+    extract_rms,
+    extract_spectral_bandwidth,
+)
 
 
 @pytest.fixture
@@ -59,3 +69,50 @@ def test_process_batch(processor):
     results = processor.process_batch(audio_list)
     assert len(results) == 3
     assert all(r["features"].shape == (45,) for r in results)
+
+
+def test_shared_spectrogram_matches_per_feature_extraction(processor, sample_audio):
+    audio = sample_audio["audio"]
+    sr = sample_audio["sample_rate"]
+
+    mfcc_mean, mfcc_std = extract_mfcc(audio, sr)
+    centroid_mean, centroid_std = extract_spectral_centroid(audio, sr)
+    expected = np.concatenate(
+        [
+            mfcc_mean,
+            mfcc_std,
+            extract_chroma(audio, sr),
+            [centroid_mean],
+            [centroid_std],
+            [extract_spectral_rolloff(audio, sr)],
+            [extract_zero_crossing_rate(audio)],
+            [extract_tempo(audio, sr)],
+            [extract_rms(audio)],
+            [extract_spectral_bandwidth(audio, sr)],
+        ]
+    )
+
+    result = processor.extract_features(sample_audio)
+    np.testing.assert_allclose(result["features"], expected, rtol=1e-6, atol=1e-8)
+
+
+def test_process_batch_parallel_preserves_order(processor):
+    audio_list = [
+        {
+            "audio": np.random.randn(22050),
+            "sample_rate": 22050,
+            "duration": 1.0,
+            "filename": f"test{i}.mp3",
+            "genre": "techno",
+            "path": f"/fake/path/test{i}.mp3",
+        }
+        for i in range(4)
+    ]
+    audio_list[1]["audio"] = None
+
+    results = processor.process_batch(audio_list, workers=2, chunksize=1)
+    assert [r["metadata"]["filename"] for r in results] == [
+        "test0.mp3",
+        "test2.mp3",
+        "test3.mp3",
+    ]
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.chroma_client import ChromaStorage
+
+
+class FlakyCollection:
+    """Records write calls; the first `failures` calls raise"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def _call(self, kind, embeddings, metadatas, ids):
+        self.calls.append((kind, len(ids)))
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+
+    def add(self, embeddings, metadatas, ids):
+        self._call("add", embeddings, metadatas, ids)
+
+    def upsert(self, embeddings, metadatas, ids):
+        self._call("upsert", embeddings, metadatas, ids)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return ChromaStorage("test", str(tmp_path))
+
+
+def samples(n):
+    ids = [f"sample_{i}" for i in range(n)]
+    return np.random.randn(n, 45), [{"genre": "techno"} for _ in ids], ids
+
+
+def test_add_samples_is_chunked_to_max_batch_size(storage):
+    storage.max_batch_size = 4
+    progress = []
+
+    storage.add_samples(
+        *samples(10), on_progress=lambda done, total: progress.append(done)
+    )
+
+    assert storage.count() == 10
+    assert progress == [4, 8, 10]
+
+
+def test_failed_chunks_are_retried_as_upserts(storage, monkeypatch):
+    monkeypatch.setattr("src.storage.chroma_client.time.sleep", lambda s: None)
+    storage.collection = FlakyCollection(failures=1)
+    storage.max_batch_size = 5
+
+    storage.add_samples(*samples(10))
+
+    assert storage.collection.calls == [("add", 5), ("upsert", 5), ("add", 5)]
+
+
+def test_concurrent_chunks_report_all_progress(storage):
+    storage.collection = FlakyCollection()
+    storage.max_batch_size = 3
+    storage.write_concurrency = 2
+    progress = []
+
+    storage.upsert_samples(
+        *samples(20), on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert len(storage.collection.calls) == 7
+    assert progress[-1] == (20, 20)
@@ -0,0 +1,45 @@
+import pytest
+import asyncio
+import time
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.api.executor import BoundedProcessPool, ExecutorSaturated
+
+
+def _slow_square(x):
+    time.sleep(0.2)
+    return x * x
+
+
+@pytest.fixture
+def pool():
+    pool = BoundedProcessPool(max_workers=2, max_pending=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_run_and_map(pool):
+    async def scenario():
+        single = await pool.run(_slow_square, 3)
+        many = await pool.map(_slow_square, [1, 2, 3])
+        return single, many
+
+    assert asyncio.run(scenario()) == (9, [1, 4, 9])
+    assert pool.pending == 0
+
+
+def test_saturated_pool_rejects_work(pool):
+    async def scenario():
+        running = asyncio.ensure_future(pool.map(_slow_square, [1, 2]))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ExecutorSaturated):
+            await pool.map(_slow_square, [3, 4])
+
+        extra = await pool.run(_slow_square, 5)
+        return await running, extra
+
+    assert asyncio.run(scenario()) == ([1, 4], 25)
+    assert pool.pending == 0
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.chroma_client import ChromaStorage
+from src.storage.export import load_samples
+from src.storage.local_index import LocalVectorStorage
+
+
+def fill(storage, n):
+    embeddings = np.random.randn(n, 45).astype(np.float32)
+    ids = [f"sample_{i}" for i in range(n)]
+    storage.add_samples(
+        embeddings, [{"genre": "techno", "i": i} for i in range(n)], ids
+    )
+    return dict(zip(ids, embeddings))
+
+
+@pytest.mark.parametrize("backend", [ChromaStorage, LocalVectorStorage])
+def test_iter_samples_pages_float32_blocks(tmp_path, backend):
+    storage = backend("test", str(tmp_path))
+    fill(storage, 25)
+
+    pages = list(storage.iter_samples(page_size=10))
+
+    assert [len(p["ids"]) for p in pages] == [10, 10, 5]
+    assert all(p["embeddings"].dtype == np.float32 for p in pages)
+    assert all(p["embeddings"].shape[1] == 45 for p in pages)
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_load_samples_matches_stored_vectors(tmp_path, use_mmap):
+    storage = LocalVectorStorage("test", str(tmp_path / "index"))
+    stored = fill(storage, 23)
+    mmap_path = str(tmp_path / "export" / "embeddings.npy") if use_mmap else None
+
+    data = load_samples(storage, mmap_path=mmap_path, page_size=7)
+
+    assert data["embeddings"].shape == (23, 45)
+    assert data["embeddings"].dtype == np.float32
+    for sample_id, row, meta in zip(data["ids"], data["embeddings"], data["metadatas"]):
+        np.testing.assert_array_equal(row, stored[sample_id])
+        assert meta["i"] == int(sample_id.split("_")[1])
+    if use_mmap:
+        np.testing.assert_array_equal(np.load(mmap_path), data["embeddings"])
+
+
+def test_load_samples_empty(tmp_path):
+    data = load_samples(LocalVectorStorage("test", str(tmp_path)))
+    assert data["ids"] == []
+    assert len(data["embeddings"]) == 0
@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import soundfile as sf
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.ingestion.feature_cache import FeatureCache
+from src.ingestion.audio_loader import AudioLoader
+from src.ingestion.audio_processor import AudioProcessor
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FeatureCache(tmp_path / "cache", max_size_mb=1)
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    genre_dir = tmp_path / "raw" / "techno"
+    genre_dir.mkdir(parents=True)
+    path = genre_dir / "loop.wav"
+    sf.write(path, (np.random.randn(22050) * 0.1).astype(np.float32), 22050)
+    return path
+
+
+class FailingLoader:
+    def load_audio(self, file_path):
+        raise AssertionError("cache hit should not decode audio")
+
+
+def test_put_get_roundtrip(cache):
+    features = np.random.randn(45)
+    cache.put("ab" * 32, features, 1.5)
+
+    entry = cache.get("ab" * 32)
+    np.testing.assert_array_equal(entry["features"], features)
+    assert entry["duration"] == 1.5
+
+
+def test_miss_on_config_change(tmp_path, cache):
+    cache.put("ab" * 32, np.zeros(45), 1.0)
+    other = FeatureCache(tmp_path / "cache", n_mfcc=20)
+    assert other.get("ab" * 32) is None
+
+
+def test_invalidate(cache):
+    cache.put("ab" * 32, np.zeros(45), 1.0)
+    cache.put("cd" * 32, np.zeros(45), 1.0)
+
+    cache.invalidate("ab" * 32)
+    assert cache.get("ab" * 32) is None
+    assert cache.get("cd" * 32) is not None
+
+    cache.invalidate()
+    assert cache.get("cd" * 32) is None
+
+
+def test_evict_removes_stale_versions_and_lru(tmp_path, cache):
+    stale = FeatureCache(tmp_path / "cache", n_mfcc=20)
+    stale.put("ab" * 32, np.zeros(45), 1.0)
+    cache.put("cd" * 32, np.zeros(45), 1.0)
+    assert cache.evict() == 0
+    assert not stale.version_dir.exists()
+
+    cache.max_bytes = 0
+    assert cache.evict() == 1
+    assert cache.get("cd" * 32) is None
+
+
+def test_processor_uses_cache(cache, audio_file):
+    loader = AudioLoader(str(audio_file.parent.parent))
+    first = AudioProcessor(cache=cache).process_file(loader, audio_file)
+    second = AudioProcessor(cache=cache).process_file(FailingLoader(), audio_file)
+
+    np.testing.assert_array_equal(first["features"], second["features"])
+    assert second["metadata"] == first["metadata"]
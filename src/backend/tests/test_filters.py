@@ -0,0 +1,39 @@
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.filters import MetadataColumns, build_where
+
+
+def test_build_where():
+    assert build_where() is None
+    assert build_where(genre="techno") == {"genre": "techno"}
+    assert build_where(cluster=2, max_duration=4.0) == {
+        "$and": [{"cluster": 2}, {"duration": {"$lte": 4.0}}]
+    }
+
+
+def test_mask_matches_predicates():
+    columns = MetadataColumns(
+        [
+            {"genre": "techno", "cluster": 1, "duration": 2.0, "is_anomaly": True},
+            {"genre": "techno", "cluster": 2, "duration": 8.0},
+            {"genre": "house", "cluster": 1, "duration": 4.0, "is_anomaly": False},
+            {"genre": "techno"},
+        ]
+    )
+
+    assert columns.mask(None).tolist() == [True] * 4
+    assert columns.mask(build_where(genre="techno")).tolist() == [
+        True,
+        True,
+        False,
+        True,
+    ]
+    where = build_where(cluster=1, min_duration=3.0)
+    assert np.flatnonzero(columns.mask(where)).tolist() == [2]
+    assert np.flatnonzero(columns.mask({"is_anomaly": True})).tolist() == [0]
+    # 1 must not match True, as in Chroma
+    assert np.flatnonzero(columns.mask({"is_anomaly": 1})).tolist() == []
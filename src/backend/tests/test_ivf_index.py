@@ -0,0 +1,113 @@
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.models.clustering import AudioClusterer
+from src.storage.ivf_index import IVFVectorStorage, assign_lists
+from src.storage.local_index import LocalVectorStorage
+
+
+@pytest.fixture
+def embeddings():
+    np.random.seed(42)
+    centers = np.random.randn(4, 45) * 10
+    return np.vstack([c + np.random.randn(25, 45) for c in centers]).astype(np.float32)
+
+
+@pytest.fixture
+def model_path(tmp_path, embeddings):
+    path = tmp_path / "clusterer_kmeans.pkl"
+    AudioClusterer(method="kmeans", n_clusters=4).fit(embeddings).save(path)
+    return path
+
+
+@pytest.fixture
+def storage(tmp_path, embeddings, model_path):
+    storage = IVFVectorStorage(
+        persist_directory=str(tmp_path / "index"),
+        centroids_path=str(model_path),
+        nprobe=1,
+    )
+    metadata = [{"filename": f"s{i}.wav"} for i in range(len(embeddings))]
+    storage.add_samples(embeddings, metadata, [f"sample_{i}" for i in range(100)])
+    return storage
+
+
+def test_lists_partition_all_rows(storage):
+    rows = np.sort(np.concatenate(storage.lists))
+    assert rows.tolist() == list(range(100))
+    assert sorted(len(rows) for rows in storage.lists) == [25, 25, 25, 25]
+
+
+def test_matches_exact_search(tmp_path, storage, embeddings):
+    exact = LocalVectorStorage(persist_directory=str(tmp_path / "index"))
+    query = embeddings[30] + 0.1
+
+    approx = storage.search_similar(query, n_results=5)
+    assert approx["ids"] == exact.search_similar(query, n_results=5)["ids"]
+
+
+def test_probe_widens_to_fill_results(storage, embeddings):
+    results = storage.search_similar(embeddings[0], n_results=40, nprobe=1)
+    assert len(results["ids"][0]) == 40
+
+
+def test_new_samples_join_nearest_list(storage, embeddings):
+    storage.add_samples(embeddings[:1] + 0.01, [{"filename": "new.wav"}], ["new"])
+
+    new_row = storage.id_to_row["new"]
+    assert storage.assignments[new_row] == storage.assignments[0]
+    assert new_row in storage.lists[storage.assignments[0]]
+
+
+def test_assign_lists_blocks(embeddings, model_path):
+    centroids = AudioClusterer.load(model_path).model.cluster_centers_
+    full = assign_lists(embeddings, centroids.astype(np.float32))
+    blocked = assign_lists(embeddings, centroids.astype(np.float32), block_size=7)
+    assert np.array_equal(full, blocked)
+
+
+def test_falls_back_to_exact_without_model(tmp_path, embeddings):
+    storage = IVFVectorStorage(
+        persist_directory=str(tmp_path / "index"),
+        centroids_path=str(tmp_path / "missing.pkl"),
+    )
+    storage.add_samples(embeddings[:10], [{}] * 10, [f"s{i}" for i in range(10)])
+    assert storage.lists is None
+    assert storage.search_similar(embeddings[3], 1)["ids"] == [["s3"]]
+
+
+def test_filtered_probe_widens_to_fill_results(tmp_path, model_path, embeddings):
+    storage = IVFVectorStorage(
+        persist_directory=str(tmp_path / "filtered"),
+        centroids_path=str(model_path),
+        nprobe=1,
+    )
+    metadata = [{"genre": "rare" if i % 20 == 0 else "common"} for i in range(100)]
+    storage.add_samples(embeddings, metadata, [f"sample_{i}" for i in range(100)])
+
+    results = storage.search_similar(
+        embeddings[1], n_results=5, where={"genre": "rare"}
+    )
+    assert sorted(results["ids"][0]) == [f"sample_{i}" for i in (0, 20, 40, 60, 80)]
+
+
+def test_range_search_prunes_lists_without_losing_matches(
+    tmp_path, storage, embeddings
+):
+    exact = LocalVectorStorage(persist_directory=str(tmp_path / "index"))
+    query = embeddings[30] + 0.1
+
+    for max_distance in (0.01, 0.2, 1.0):
+        pruned = [
+            r
+            for page in storage.range_search(query, max_distance)
+            for r in page["rows"]
+        ]
+        scanned = [
+            r for page in exact.range_search(query, max_distance) for r in page["rows"]
+        ]
+        assert pruned == scanned
+    assert storage._range_scan(query, 0.01)[-1].size < 100
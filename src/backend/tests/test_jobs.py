@@ -0,0 +1,117 @@
+import asyncio
+import io
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.api.jobs import IngestJob, JobQueue, is_archive
+
+
+def make_zip(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("pack/techno/kick.wav", b"RIFF kick")
+        zf.writestr("../../escape.mp3", b"ID3 escape")
+        zf.writestr("pack/readme.txt", b"not audio")
+
+
+def make_tar(path):
+    with tarfile.open(path, "w:gz") as tf:
+        info = tarfile.TarInfo("house/pad.flac")
+        info.size = 9
+        tf.addfile(info, io.BytesIO(b"fLaC pad!"))
+
+
+def test_is_archive():
+    assert is_archive("pack.ZIP")
+    assert is_archive("pack.tar.gz")
+    assert not is_archive("kick.wav")
+
+
+def test_expand_archives_keeps_audio_inside_job_dir(tmp_path):
+    job = IngestJob(tmp_path)
+    for name, make in (("a.zip", make_zip), ("b.tar.gz", make_tar)):
+        path = job.stage_path(name)
+        make(path)
+        job.add_archive(path, name)
+
+    job.expand_archives()
+
+    assert [(f["filename"], f["genre"]) for f in job.files] == [
+        ("kick.wav", "techno"),
+        ("escape.mp3", None),
+        ("pad.flac", "house"),
+    ]
+    for f in job.files:
+        assert Path(f["path"]).parent == job.directory
+    assert Path(job.files[2]["path"]).read_bytes() == b"fLaC pad!"
+    assert not list(job.directory.glob("*.zip"))
+
+
+def test_unreadable_archive_is_rejected(tmp_path):
+    job = IngestJob(tmp_path, genre="techno")
+    path = job.stage_path("broken.zip")
+    path.write_bytes(b"not an archive")
+    job.add_archive(path, "broken.zip")
+
+    job.expand_archives()
+
+    assert job.files == []
+    assert job.as_dict()["total_files"] == 1
+    assert job.errors[0]["filename"] == "broken.zip"
+
+
+def test_expand_archives_checks_size_and_content(tmp_path):
+    job = IngestJob(tmp_path)
+    path = job.stage_path("pack.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("ok.wav", b"RIFF" + bytes(100))
+        zf.writestr("huge.wav", b"RIFF" + bytes(2 * 1024 * 1024))
+        zf.writestr("fake.mp3", b"<html>not audio</html>")
+    job.add_archive(path, "pack.zip")
+
+    job.expand_archives(max_member_mb=1)
+
+    assert [f["filename"] for f in job.files] == ["ok.wav"]
+    assert [e["filename"] for e in job.errors] == ["huge.wav", "fake.mp3"]
+    assert len(list(job.directory.iterdir())) == 1
+
+
+def test_expand_archives_stops_at_job_budget(tmp_path):
+    job = IngestJob(tmp_path)
+    path = job.stage_path("pack.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(5):
+            zf.writestr(f"{i}.wav", b"RIFF" + bytes(400 * 1024))
+    job.add_archive(path, "pack.zip")
+
+    job.expand_archives(max_member_mb=1, max_total_mb=1)
+
+    assert len(job.files) == 2
+    assert job.errors[-1]["filename"] == "pack.zip"
+    assert sum(Path(f["path"]).stat().st_size for f in job.files) <= 1024 * 1024
+
+
+def test_job_queue_runs_jobs_and_prunes(tmp_path):
+    async def runner(job):
+        job.processed = job.succeeded = len(job.files)
+        if job.genre == "boom":
+            raise RuntimeError("boom")
+
+    async def scenario():
+        queue = JobQueue(runner, max_finished=2)
+        queue.start()
+        jobs = [queue.submit(IngestJob(tmp_path, genre=g)) for g in "ab"]
+        jobs.append(queue.submit(IngestJob(tmp_path, genre="boom")))
+        while jobs[-1].finished_at is None:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue, jobs
+
+    queue, jobs = asyncio.run(scenario())
+
+    assert [job.status for job in jobs] == ["completed", "completed", "failed"]
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[2].id).errors[0]["error"] == "boom"
@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.knn_graph import KnnGraph, KnnGraphStore
+
+
+@pytest.fixture
+def embeddings():
+    np.random.seed(42)
+    return np.random.randn(200, 45).astype(np.float32)
+
+
+def brute_force(embeddings, k):
+    distances = ((embeddings[:, None] - embeddings[None]) ** 2).sum(axis=-1)
+    np.fill_diagonal(distances, np.inf)
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+def test_build_matches_brute_force(embeddings):
+    ids = [f"sample_{i}" for i in range(200)]
+    graph = KnnGraph.build(embeddings, ids, k=5, block_size=32, n_threads=4)
+
+    assert graph.neighbors.dtype == np.int32
+    assert graph.distances.dtype == np.float16
+    np.testing.assert_array_equal(graph.neighbors, brute_force(embeddings, 5))
+
+    neighbour_ids, distances = graph.neighbours("sample_0", 3)
+    assert neighbour_ids == [ids[r] for r in brute_force(embeddings, 3)[0]]
+    assert distances == sorted(distances)
+    assert graph.neighbours("missing") is None
+
+
+def test_small_corpus_is_padded(embeddings):
+    graph = KnnGraph.build(embeddings[:3], ["a", "b", "c"], k=5)
+    assert graph.neighbors[:, 2:].tolist() == [[-1, -1, -1]] * 3
+    assert len(graph.neighbours("a")[0]) == 2
+
+
+def test_update_matches_rebuild(embeddings):
+    ids = [f"sample_{i}" for i in range(150)]
+    graph = KnnGraph.build(embeddings[:150], ids, k=5, block_size=32)
+
+    # Drop a few samples, re-embed a few and add the rest
+    updated = embeddings.copy()
+    updated[:5] += 1.0
+    keep = [i for i in range(200) if i % 30]
+    new_ids = [ids[i] if i < 150 else f"new_{i}" for i in keep]
+
+    graph = graph.update(
+        updated[keep], new_ids, changed=[f"sample_{i}" for i in range(5)]
+    )
+    np.testing.assert_array_equal(graph.neighbors, brute_force(updated[keep], 5))
+
+
+def test_store_reloads_saved_graph(tmp_path, embeddings):
+    path = tmp_path / "knn_graph.npz"
+    store = KnnGraphStore(path)
+    assert store.graph is None
+
+    KnnGraph.build(embeddings[:10], [str(i) for i in range(10)], k=3).save(path)
+    assert store.graph.ids[9] == "9"
+
+    KnnGraph.build(embeddings[:20], [str(i) for i in range(20)], k=3).save(path)
+    assert len(store.graph.ids) == 20
@@ -0,0 +1,127 @@
+import pytest
+import numpy as np
+import multiprocessing
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.storage.local_index import LocalVectorStorage, top_k
+
+
+@pytest.fixture
+def embeddings():
+    np.random.seed(42)
+    return np.random.randn(50, 45).astype(np.float32)
+
+
+@pytest.fixture
+def storage(tmp_path, embeddings):
+    storage = LocalVectorStorage(persist_directory=str(tmp_path))
+    metadata = [{"filename": f"s{i}.wav", "genre": "techno"} for i in range(50)]
+    ids = [f"sample_{i}" for i in range(50)]
+    storage.add_samples(embeddings, metadata, ids)
+    return storage
+
+
+def test_top_k_sorted():
+    distances = np.array([[5.0, 1.0, 3.0, 0.5, 2.0]])
+    assert top_k(distances, 3).tolist() == [[3, 1, 4]]
+    assert top_k(distances, 10).tolist() == [[3, 1, 4, 2, 0]]
+
+
+def test_search_matches_brute_force(storage, embeddings):
+    query = embeddings[7] + 0.01
+    results = storage.search_similar(query, n_results=5)
+
+    expected = np.sum((embeddings - query) ** 2, axis=1)
+    assert results["ids"][0] == [f"sample_{i}" for i in np.argsort(expected)[:5]]
+    np.testing.assert_allclose(
+        results["distances"][0], np.sort(expected)[:5], rtol=1e-4, atol=1e-4
+    )
+
+
+def test_batch_search(storage, embeddings):
+    results = storage.search_similar_batch(embeddings[:3], n_results=2)
+    assert [ids[0] for ids in results["ids"]] == ["sample_0", "sample_1", "sample_2"]
+
+
+def test_add_upsert_delete(tmp_path, storage, embeddings):
+    storage.add_samples(embeddings[:1] + 100, [{"genre": "x"}], ["sample_0"])
+    assert storage.count() == 50
+    assert storage.search_similar(embeddings[0], 1)["ids"][0] == ["sample_0"]
+
+    storage.upsert_samples(embeddings[:1] + 100, [{"genre": "x"}], ["sample_0"])
+    storage.delete_samples(["sample_1", "sample_2"])
+    assert storage.count() == 48
+
+    reopened = LocalVectorStorage(persist_directory=str(tmp_path))
+    results = reopened.search_similar(embeddings[0] + 100, 1)
+    assert results["ids"][0] == ["sample_0"]
+    assert results["metadatas"][0] == [{"genre": "x"}]
+
+
+def test_other_instance_sees_writes(tmp_path, storage, embeddings):
+    reader = LocalVectorStorage(persist_directory=str(tmp_path))
+    version = reader.version()
+    storage.add_samples(embeddings[:1], [{"genre": "new"}], ["sample_new"])
+    assert reader.count() == 51
+    assert reader.version() != version
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+
+def _add_one(directory, sample_id):
+    storage = LocalVectorStorage(persist_directory=directory)
+    storage.add_samples(np.ones((1, 45), dtype=np.float32), [{}], [sample_id])
+
+
+def test_writers_in_other_processes_do_not_lose_updates(tmp_path, storage):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_add_one, args=(str(tmp_path), f"extra_{i}"))
+        for i in range(8)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert storage.count() == 58
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+
+def test_duplicate_ids_in_batch_rejected(storage, embeddings):
+    with pytest.raises(ValueError, match="sample_new"):
+        storage.add_samples(embeddings[:2], [{}, {}], ["sample_new", "sample_new"])
+    assert storage.count() == 50
+
+
+def test_get_samples_with_embeddings(storage, embeddings):
+    samples = storage.get_samples(["sample_3", "missing"], include_embeddings=True)
+    assert samples["ids"] == ["sample_3"]
+    assert samples["embeddings"].dtype == np.float32
+    np.testing.assert_array_equal(samples["embeddings"][0], embeddings[3])
+    assert "embeddings" not in storage.get_samples(["sample_3"])
+
+
+def test_filtered_search_returns_n_matches(tmp_path, embeddings):
+    storage = LocalVectorStorage(persist_directory=str(tmp_path / "filtered"))
+    metadata = [
+        {"genre": "house" if i % 10 == 0 else "techno", "duration": float(i)}
+        for i in range(50)
+    ]
+    storage.add_samples(embeddings, metadata, [f"sample_{i}" for i in range(50)])
+
+    where = {"$and": [{"genre": "techno"}, {"duration": {"$gte": 20.0}}]}
+    results = storage.search_similar(embeddings[0], 5, where=where)
+    assert len(results["ids"][0]) == 5
+    assert all(
+        m["genre"] == "techno" and m["duration"] >= 20 for m in results["metadatas"][0]
+    )
+
+    rows = [i for i in range(50) if i % 10 and i >= 20]
+    distances = ((embeddings[rows] - embeddings[0]) ** 2).sum(axis=1)
+    expected = [f"sample_{rows[i]}" for i in np.argsort(distances)[:5]]
+    assert results["ids"][0] == expected
+
+    results = storage.search_similar(embeddings[0], 20, where={"genre": "house"})
+    assert len(results["ids"][0]) == 5
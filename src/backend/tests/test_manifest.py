@@ -0,0 +1,65 @@
+import pytest
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.ingestion.manifest import FileManifest
+
+
+@pytest.fixture
+def library(tmp_path):
+    genre_dir = tmp_path / "raw" / "techno"
+    genre_dir.mkdir(parents=True)
+    files = []
+    for i in range(3):
+        path = genre_dir / f"s{i}.wav"
+        path.write_bytes(f"audio-{i}".encode())
+        files.append(path)
+    return files
+
+
+@pytest.fixture
+def manifest(tmp_path, library):
+    manifest = FileManifest(tmp_path / "manifest.json")
+    for path in library:
+        manifest.record(path, manifest.assign_id(path))
+    manifest.save()
+    return FileManifest(tmp_path / "manifest.json")
+
+
+def test_new_files_get_sequential_ids(tmp_path, library):
+    manifest = FileManifest(tmp_path / "manifest.json")
+    diff = manifest.diff(library)
+
+    assert diff["new"] == library
+    assert [manifest.assign_id(p) for p in library] == [
+        "sample_0",
+        "sample_1",
+        "sample_2",
+    ]
+
+
+def test_diff_detects_changes(manifest, library):
+    library[0].write_bytes(b"edited")
+    os.utime(library[1], (0, 12345))
+    library[2].unlink()
+    new_file = library[0].parent / "s3.wav"
+    new_file.write_bytes(b"audio-3")
+
+    diff = manifest.diff([library[0], library[1], new_file])
+
+    assert diff["new"] == [new_file]
+    assert diff["changed"] == [library[0]]
+    assert diff["deleted"] == [str(library[2])]
+    assert diff["unchanged"] == 1
+
+
+def test_changed_file_keeps_sample_id(manifest, library):
+    assert manifest.assign_id(library[1]) == "sample_1"
+    assert manifest.assign_id(library[0].parent / "s9.wav") == "sample_3"
+
+
+def test_remove_returns_sample_id(manifest, library):
+    assert manifest.remove(str(library[2])) == "sample_2"
+    assert manifest.diff(library)["new"] == [library[2]]
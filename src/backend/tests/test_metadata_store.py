@@ -0,0 +1,76 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.metadata_store import MetadataStore
+
+
+def write_metadata(path, n):
+    records = [
+        {
+            "filename": f"s{i}.wav",
+            "genre": "techno" if i % 2 else "house",
+            "cluster": i % 3,
+        }
+        for i in range(n)
+    ]
+    path.write_text(json.dumps(records))
+    return records
+
+
+@pytest.fixture
+def store(tmp_path):
+    write_metadata(tmp_path / "metadata.json", 30)
+    (tmp_path / "clusters.json").write_text(json.dumps({"0": {"size": 10}}))
+    return MetadataStore(tmp_path / "metadata.json", tmp_path / "clusters.json")
+
+
+def test_filters_match_list_scan(store, tmp_path):
+    records = json.loads((tmp_path / "metadata.json").read_text())
+    expected = [r for r in records if r["genre"] == "techno" and r["cluster"] == 1]
+
+    page = store.search(genre="techno", cluster=1, limit=100)
+    assert page["results"] == expected
+    assert page["total_matches"] == len(expected)
+    assert store.search(genre="jazz")["total_matches"] == 0
+
+
+def test_cursor_pages_through_all_matches(store):
+    seen = []
+    cursor = None
+    while True:
+        page = store.search(genre="house", limit=4, cursor=cursor)
+        seen.extend(r["filename"] for r in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [f"s{i}.wav" for i in range(0, 30, 2)]
+    assert store.search(genre="house", limit=4, offset=12)["results"][0] == {
+        "filename": "s24.wav",
+        "genre": "house",
+        "cluster": 0,
+    }
+
+
+def test_reloads_when_artifact_changes(store, tmp_path):
+    cursor = store.search(limit=5)["next_cursor"]
+    assert store.search()["total_matches"] == 30
+
+    write_metadata(tmp_path / "metadata.json", 12)
+    assert store.search()["total_matches"] == 12
+
+    with pytest.raises(ValueError):
+        store.search(limit=5, cursor=cursor)
+
+
+def test_missing_artifacts(tmp_path):
+    store = MetadataStore(tmp_path / "missing.json", tmp_path / "missing2.json")
+    with pytest.raises(FileNotFoundError):
+        store.search()
+    with pytest.raises(FileNotFoundError):
+        store.get_clusters()
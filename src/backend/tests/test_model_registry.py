@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.models.clustering import AudioClusterer
+from src.models.registry import ClustererRegistry
+
+
+def fitted(n_clusters, seed=0):
+    embeddings = np.random.default_rng(seed).normal(size=(60, 45))
+    return AudioClusterer(n_clusters=n_clusters).fit(embeddings), embeddings
+
+
+def test_assign_matches_predict(tmp_path):
+    clusterer, embeddings = fitted(4)
+    clusterer.save(tmp_path / "clusterer_kmeans.pkl")
+
+    registry = ClustererRegistry(tmp_path / "clusterer_kmeans.pkl")
+    assigned = [registry.assign(e) for e in embeddings]
+
+    assert assigned == clusterer.predict(embeddings).tolist()
+
+
+def test_hot_reload_on_new_model(tmp_path):
+    path = tmp_path / "clusterer_kmeans.pkl"
+    fitted(3)[0].save(path)
+    registry = ClustererRegistry(path)
+    assert registry.clusterer.n_clusters == 3
+
+    fitted(5, seed=1)[0].save(path)
+    assert registry.clusterer.n_clusters == 5
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_no_model_assigns_minus_one(tmp_path):
+    registry = ClustererRegistry(tmp_path / "clusterer_kmeans.pkl")
+    assert registry.assign(np.zeros(45)) == -1
+    assert registry.clusterer is None
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.ingestion.pipeline import iter_batches, stream_ingest
+from src.embeddings.audio_embedder import AudioEmbedder
+from utils.parallel import parallel_map
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.batches = []
+
+    def add_samples(self, embeddings, metadata, ids):
+        self.batches.append((len(embeddings), list(ids)))
+
+
+def _processed(n):
+    for i in range(n):
+        yield {
+            "features": np.random.randn(45),
+            "metadata": {"filename": f"test{i}.mp3", "genre": "techno"},
+        }
+
+
+def _square(x):
+    return x * x
+
+
+def test_iter_batches():
+    batches = list(iter_batches(range(7), 3))
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_stream_ingest_batches():
+    storage = RecordingStorage()
+    summary = stream_ingest(_processed(10), AudioEmbedder(), storage, batch_size=4)
+
+    assert [size for size, _ in storage.batches] == [4, 4, 2]
+    assert storage.batches[-1][1] == ["sample_8", "sample_9"]
+    assert summary == {"total": 10, "genres": {"techno": 10}}
+
+
+def test_stream_ingest_hooks_wrap_each_write():
+    storage = RecordingStorage()
+    events = []
+
+    stream_ingest(
+        _processed(5),
+        AudioEmbedder(),
+        storage,
+        batch_size=3,
+        before_commit=lambda batch, ids: events.append(
+            ("before", len(storage.batches))
+        ),
+        on_commit=lambda batch, ids: events.append(("after", len(storage.batches))),
+    )
+
+    assert events == [("before", 0), ("after", 1), ("before", 1), ("after", 2)]
+
+
+def test_parallel_map_is_lazy_and_ordered():
+    consumed = []
+
+    def items():
+        for i in range(100):
+            consumed.append(i)
+            yield i
+
+    results = parallel_map(_square, items(), workers=2, chunksize=4)
+    assert next(results) == 0
+    assert len(consumed) < 100
+    assert list(results) == [i * i for i in range(1, 100)]
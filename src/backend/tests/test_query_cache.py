@@ -0,0 +1,69 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.api.query_cache import LRUCache, QueryCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_items=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_items=10, ttl=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_query_cache_results_follow_collection_version():
+    cache = QueryCache(max_items=10, ttl=60)
+    embedding = np.random.randn(45).astype(np.float32)
+    results = {"ids": [["sample_1"]], "metadatas": [[{}]], "distances": [[0.1]]}
+
+    cache.put_results(embedding, 5, results)
+    assert cache.get_results(embedding, 5) is results
+    assert cache.get_results(embedding, 3) is None
+
+    cache.bump_version()
+    assert cache.get_results(embedding, 5) is None
+
+
+def test_query_cache_embeddings_survive_version_bump():
+    cache = QueryCache(max_items=10, ttl=60)
+    key = cache.content_key(b"RIFF audio bytes")
+    cache.put_embedding(key, {"embedding": np.zeros(45), "duration": 1.0})
+
+    cache.bump_version()
+    assert cache.get_embedding(key)["duration"] == 1.0
+    assert cache.content_key(b"RIFF audio bytes") == key
+
+
+def test_query_cache_follows_store_version():
+    store_version = [1]
+    cache = QueryCache(max_items=10, ttl=60, version_fn=lambda: store_version[0])
+    embedding = np.random.randn(45).astype(np.float32)
+    results = {"ids": [["sample_1"]], "metadatas": [[{}]], "distances": [[0.1]]}
+
+    cache.put_results(embedding, 5, results)
+    assert cache.get_results(embedding, 5) is results
+
+    # Another process wrote to the store
+    store_version[0] = 2
+    assert cache.get_results(embedding, 5) is None
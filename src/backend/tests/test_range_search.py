@@ -0,0 +1,53 @@
+import json
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.api.range_search import decode_cursor, encode_cursor, stream_matches
+from src.storage.local_index import LocalVectorStorage
+
+
+def make_storage(tmp_path):
+    np.random.seed(42)
+    embeddings = np.random.randn(300, 45).astype(np.float32)
+    storage = LocalVectorStorage(persist_directory=str(tmp_path))
+    metadata = [{"filename": f"s{i}.wav", "genre": "techno"} for i in range(300)]
+    storage.add_samples(embeddings, metadata, [f"sample_{i}" for i in range(300)])
+    return storage, embeddings
+
+
+def read_lines(chunks):
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def test_cursor_round_trip():
+    embedding = np.arange(45, dtype=np.float32)
+    decoded, max_distance, row = decode_cursor(encode_cursor(embedding, 0.3, 17))
+    np.testing.assert_array_equal(decoded, embedding)
+    assert (max_distance, row) == (0.3, 17)
+
+
+def test_pages_cover_every_match_once(tmp_path):
+    storage, embeddings = make_storage(tmp_path)
+    query = embeddings[0]
+
+    unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    distances = 1 - unit @ (query / np.linalg.norm(query))
+    expected = [f"sample_{i}" for i in np.flatnonzero(distances <= 0.9)]
+    assert len(expected) > 20
+
+    found, offset = [], 0
+    while True:
+        matches, tail = read_lines(
+            stream_matches(storage, query, 0.9, offset=offset, limit=7, page_size=50)
+        )
+        found.extend(m["sample_id"] for m in matches)
+        if tail["next_cursor"] is None:
+            break
+        assert tail["returned"] == 7
+        query, _, offset = decode_cursor(tail["next_cursor"])
+
+    assert found == expected
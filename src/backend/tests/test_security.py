@@ -43,3 +43,9 @@ def test_validate_file_content_mp3():
 def test_validate_file_content_wav():
     wav_header = b"RIFF" + b"\x00" * 4 + b"WAVE" + b"\x00" * 100
     assert validate_file_content(wav_header, [".wav"]) == True
+
+
+def test_validate_file_content_mpeg_frame_sync():
+    frame_header = b"\xff\xfb\x90\x64" + b"\x00" * 100
+    assert validate_file_content(frame_header, [".mp3"]) == True
+    assert validate_file_content(b"<html>" + b"\x00" * 100, [".mp3"]) == False
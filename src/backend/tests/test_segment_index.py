@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.segment_index import SegmentIndex
+from utils.feature_extractors import extract_window_features
+
+
+@pytest.fixture
+def windows():
+    np.random.seed(42)
+    return {
+        "a": np.random.randn(10, 45).astype(np.float32),
+        "b": np.random.randn(4, 45).astype(np.float32),
+        "c": np.random.randn(7, 45).astype(np.float32),
+    }
+
+
+def test_search_returns_best_window_per_sample(tmp_path, windows):
+    index = SegmentIndex(str(tmp_path), window_seconds=2.0, hop_seconds=0.5)
+    index.upsert(list(windows), list(windows.values()))
+    assert index.windows.dtype == np.float16
+
+    results = index.search(windows["c"][5] + 0.01, n_results=2)
+    assert results[0]["sample_id"] == "c"
+    assert results[0]["offset"] == 2.5
+    assert len({r["sample_id"] for r in results}) == 2
+
+
+def test_upsert_delete_and_reopen(tmp_path, windows):
+    index = SegmentIndex(str(tmp_path))
+    index.upsert(list(windows), list(windows.values()))
+    index.upsert(["a"], [windows["b"][:2]])
+    index.delete(["b"])
+
+    reopened = SegmentIndex(str(tmp_path))
+    assert reopened.count() == 2
+    assert np.diff(reopened.starts).tolist() == [7, 2]
+    assert reopened.search(windows["b"][1], 1)[0] == {
+        "sample_id": "a",
+        "offset": 0.5,
+        "distance": pytest.approx(0.0, abs=1e-2),
+    }
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+
+def test_window_features_follow_the_signal():
+    sr = 22050
+    np.random.seed(0)
+    tone = np.sin(2 * np.pi * 440 * np.arange(3 * sr) / sr)
+    noise = np.random.randn(3 * sr) * 0.3
+    signal = np.concatenate([tone, noise]).astype(np.float32)
+
+    features = extract_window_features(signal, sr, window_seconds=1.0, hop_seconds=0.5)
+    # 0.5s hops round to 22 frames of 512 samples
+    assert features.shape == (10, 45)
+    assert features.dtype == np.float32
+
+    # Zero-crossing rate: low over the tone, high over the noise
+    zcr = features[:, 41]
+    assert zcr[0] < 0.1 < zcr[-1]
+
+    short = extract_window_features(signal[: sr // 2], sr, 1.0, 0.5)
+    assert short.shape == (1, 45)
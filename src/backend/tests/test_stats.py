@@ -0,0 +1,96 @@
+import multiprocessing
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.local_index import LocalVectorStorage
+from src.storage.stats import CollectionStats
+
+
+def metadatas():
+    return [
+        {"filename": "a.wav", "genre": "techno", "cluster": 0},
+        {"filename": "b.wav", "genre": "techno", "cluster": 1},
+        {"filename": "c.wav", "genre": "house"},
+    ]
+
+
+def test_add_remove_and_persist(tmp_path):
+    stats = CollectionStats(tmp_path / "stats.json")
+    stats.add(metadatas(), embedding_dimension=45)
+    stats.remove(metadatas()[:1])
+    stats.save()
+
+    reloaded = CollectionStats(tmp_path / "stats.json")
+    assert reloaded.total == 2
+    assert reloaded.genres == {"techno": 1, "house": 1}
+    assert reloaded.clusters == {"1": 1}
+    assert reloaded.embedding_dimension == 45
+
+
+def test_refresh_picks_up_other_writers(tmp_path):
+    reader = CollectionStats(tmp_path / "stats.json")
+    writer = CollectionStats(tmp_path / "stats.json")
+    writer.add(metadatas(), embedding_dimension=45)
+    writer.save()
+
+    reader.refresh()
+    assert reader.total == 3
+
+
+def _add_in_process(path):
+    stats = CollectionStats(path)
+    for _ in range(20):
+        with stats.update():
+            stats.add(metadatas()[:1])
+
+
+def test_update_from_several_processes_keeps_every_count(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_add_in_process, args=(tmp_path / "stats.json",))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stats = CollectionStats(tmp_path / "stats.json")
+    assert stats.total == 80
+    assert stats.genres == {"techno": 80}
+
+
+def test_failed_update_is_not_saved(tmp_path):
+    stats = CollectionStats(tmp_path / "stats.json")
+    with stats.update():
+        stats.add(metadatas())
+
+    try:
+        with stats.update():
+            stats.add(metadatas())
+            raise RuntimeError("store failed")
+    except RuntimeError:
+        pass
+
+    assert stats.total == 3
+    assert CollectionStats(tmp_path / "stats.json").total == 3
+
+
+def test_rebuild_matches_storage(tmp_path):
+    storage = LocalVectorStorage("test", str(tmp_path))
+    embeddings = np.random.randn(3, 8).astype(np.float32)
+    storage.add_samples(embeddings, metadatas(), ["s0", "s1", "s2"])
+
+    stats = CollectionStats(tmp_path / "stats.json")
+    stats.add([{"genre": "stale"}])
+    stats.rebuild(storage)
+
+    assert stats.total == 3
+    assert stats.genres == {"techno": 2, "house": 1}
+    assert stats.clusters == {"0": 1, "1": 1}
+    assert stats.embedding_dimension == 8
+    assert storage.get_samples(["s2", "missing"])["metadatas"] == metadatas()[2:]
@@ -0,0 +1,74 @@
+import asyncio
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.api.uploads import read_upload, max_request_bytes
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def upload(data, filename="kick.wav", size=None):
+    return UploadFile(file=CountingFile(data), filename=filename, size=size)
+
+
+def read(file, **kwargs):
+    return asyncio.run(read_upload(file, **kwargs))
+
+
+def test_read_upload_returns_content():
+    data = b"RIFF" + b"\x00" * 4 + b"WAVE" + b"\x01" * 5000
+    assert read(upload(data), chunk_size=1024) == data
+
+
+def test_read_upload_stops_at_limit():
+    file = upload(b"RIFF" + b"\x00" * (3 * 1024 * 1024))
+    with pytest.raises(HTTPException) as exc:
+        read(file, max_size_mb=1, chunk_size=64 * 1024)
+
+    assert exc.value.status_code == 413
+    assert file.file.bytes_read <= 1024 * 1024 + 64 * 1024
+
+
+def test_read_upload_rejects_declared_size_before_reading():
+    file = upload(b"RIFF" + b"\x00" * 100, size=20 * 1024 * 1024)
+    with pytest.raises(HTTPException) as exc:
+        read(file, max_size_mb=10)
+
+    assert exc.value.status_code == 413
+    assert file.file.bytes_read == 0
+
+
+def test_read_upload_sniffs_magic_from_first_chunk():
+    file = upload(b"<html>" + b"\x00" * 100000)
+    with pytest.raises(HTTPException) as exc:
+        read(file, chunk_size=1024)
+
+    assert exc.value.status_code == 400
+    assert file.file.bytes_read == 1024
+
+
+def test_read_upload_rejects_empty_file():
+    with pytest.raises(HTTPException) as exc:
+        read(upload(b""))
+    assert exc.value.status_code == 400
+
+
+def test_max_request_bytes():
+    assert max_request_bytes("/stats") is None
+    assert max_request_bytes("/search", 1) > 1024 * 1024
+    assert max_request_bytes("/search/batch", 1) > max_request_bytes("/search", 1)
@@ -0,0 +1,87 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.storage.local_index import LocalVectorStorage
+from src.storage.write_buffer import WriteBehindBuffer
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.adds = []
+        self.upserts = []
+
+    def add_samples(self, embeddings, metadata, ids):
+        self.adds.append(list(ids))
+
+    def upsert_samples(self, embeddings, metadata, ids):
+        self.upserts.append(list(ids))
+
+    def count(self):
+        return sum(len(ids) for ids in self.adds)
+
+
+def add(buffer, start, n):
+    ids = [f"s{i}" for i in range(start, start + n)]
+    buffer.add_samples(np.random.randn(n, 4), [{"genre": "techno"} for _ in ids], ids)
+
+
+def test_flushes_in_batches_of_max_items(tmp_path):
+    storage = RecordingStorage()
+    flushed = []
+    buffer = WriteBehindBuffer(
+        storage, tmp_path / "log.jsonl", max_items=4, on_flush=flushed.append
+    )
+
+    for i in range(5):
+        add(buffer, i, 1)
+
+    assert storage.adds == [["s0", "s1", "s2", "s3"]]
+    assert flushed == [["s0", "s1", "s2", "s3"]]
+    assert buffer.pending == 1
+    assert buffer.count() == 5
+
+
+def test_time_threshold_flush(tmp_path):
+    storage = RecordingStorage()
+    buffer = WriteBehindBuffer(
+        storage, tmp_path / "log.jsonl", max_items=100, max_delay=0.05
+    )
+    buffer.start()
+    add(buffer, 0, 2)
+
+    deadline = time.monotonic() + 2
+    while not storage.adds and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.close()
+
+    assert storage.adds == [["s0", "s1"]]
+    assert not (tmp_path / "log.jsonl").exists()
+
+
+def test_unflushed_samples_survive_a_crash(tmp_path):
+    log_path = tmp_path / "log.jsonl"
+    crashed = WriteBehindBuffer(RecordingStorage(), log_path, max_items=100)
+    add(crashed, 0, 3)
+    with open(log_path, "a") as f:
+        f.write('{"id": "torn", "embe')
+
+    storage = LocalVectorStorage("test", str(tmp_path / "index"))
+    WriteBehindBuffer(storage, log_path)
+
+    assert sorted(storage.get_all_samples()["ids"]) == ["s0", "s1", "s2"]
+    assert not log_path.exists()
+
+
+def test_close_flushes_remaining(tmp_path):
+    storage = RecordingStorage()
+    buffer = WriteBehindBuffer(storage, tmp_path / "log.jsonl", max_items=100)
+    buffer.start()
+    add(buffer, 0, 3)
+    buffer.close()
+
+    assert storage.adds == [["s0", "s1", "s2"]]
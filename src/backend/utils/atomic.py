@@ -0,0 +1,47 @@
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield a temporary path next to `path` and move it into place on success.
+
+    Readers polling `path` see either the old file or the complete new one,
+    and processes that still hold the old file open (or memory-mapped) keep
+    reading its inode undisturbed.
+    """
+    path = Path(path)
+    # Keep the real suffix last so writers like np.save don't append another
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.stem}.", suffix=path.suffix
+    )
+    os.close(fd)
+
+    try:
+        yield Path(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def write_json_atomic(path, data, indent=2):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=indent)
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on `path` (created if missing), held across processes"""
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
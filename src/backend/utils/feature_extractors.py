@@ -1,24 +1,54 @@
 import numpy as np
 import librosa
 
-
-def extract_mfcc(audio, sr, n_mfcc=13):
-    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=n_mfcc)
+N_FFT = 2048
+HOP_LENGTH = 512
+
+
+def compute_spectrogram(audio, sr, n_fft=N_FFT, hop_length=HOP_LENGTH):
+    """
+    Compute the spectral intermediates shared by every descriptor in one pass.
+
+    A single STFT feeds the magnitude and power spectrograms, the log-mel
+    spectrogram (used by MFCC) and the onset envelope (used by tempo), using
+    the same defaults librosa applies when each feature is computed from `y`.
+    """
+    magnitude = np.abs(librosa.stft(audio, n_fft=n_fft, hop_length=hop_length))
+    power = magnitude**2
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr))
+    onset_envelope = librosa.onset.onset_strength(
+        S=mel_db, sr=sr, hop_length=hop_length, aggregate=np.median
+    )
+
+    return {
+        "magnitude": magnitude,
+        "power": power,
+        "mel_db": mel_db,
+        "onset_envelope": onset_envelope,
+    }
+
+
+def extract_mfcc(audio, sr, n_mfcc=13, spectrogram=None):
+    mel_db = spectrogram["mel_db"] if spectrogram else None
+    mfcc = librosa.feature.mfcc(y=audio, sr=sr, S=mel_db, n_mfcc=n_mfcc)
     return np.mean(mfcc, axis=1), np.std(mfcc, axis=1)
 
 
-def extract_chroma(audio, sr, n_chroma=12):
-    chroma = librosa.feature.chroma_stft(y=audio, sr=sr, n_chroma=n_chroma)
+def extract_chroma(audio, sr, n_chroma=12, spectrogram=None):
+    power = spectrogram["power"] if spectrogram else None
+    chroma = librosa.feature.chroma_stft(y=audio, sr=sr, S=power, n_chroma=n_chroma)
     return np.mean(chroma, axis=1)
 
 
-def extract_spectral_centroid(audio, sr):
-    centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)
+def extract_spectral_centroid(audio, sr, spectrogram=None):
+    magnitude = spectrogram["magnitude"] if spectrogram else None
+    centroid = librosa.feature.spectral_centroid(y=audio, sr=sr, S=magnitude)
     return np.mean(centroid), np.std(centroid)
 
 
-def extract_spectral_rolloff(audio, sr):
-    rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)
+def extract_spectral_rolloff(audio, sr, spectrogram=None):
+    magnitude = spectrogram["magnitude"] if spectrogram else None
+    rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr, S=magnitude)
     return np.mean(rolloff)
 
 
@@ -27,10 +57,13 @@ def extract_zero_crossing_rate(audio):
     return np.mean(zcr)
 
 
-def extract_tempo(audio, sr):
+def extract_tempo(audio, sr, spectrogram=None):
+    onset_envelope = spectrogram["onset_envelope"] if spectrogram else None
     try:
-        tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
-        return float(tempo)
+        tempo, _ = librosa.beat.beat_track(
+            y=audio, sr=sr, onset_envelope=onset_envelope
+        )
+        return float(np.atleast_1d(tempo)[0])
     except:
         return 0.0
 
@@ -40,6 +73,101 @@ def extract_rms(audio):
     return np.mean(rms)
 
 
-def extract_spectral_bandwidth(audio, sr):
-    bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=sr)
+def extract_spectral_bandwidth(audio, sr, spectrogram=None):
+    magnitude = spectrogram["magnitude"] if spectrogram else None
+    bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=sr, S=magnitude)
     return np.mean(bandwidth)
+
+
+def window_bounds(n_frames, window_frames, hop_frames):
+    """Start and end frames of each full window; short inputs get one window"""
+    if n_frames <= window_frames:
+        return np.array([0]), np.array([n_frames])
+    starts = np.arange(0, n_frames - window_frames + 1, hop_frames)
+    return starts, starts + window_frames
+
+
+def window_stats(frames, starts, ends):
+    """Per-window mean and std of (k, T) frame features, via cumulative sums"""
+    frames = np.asarray(frames, dtype=np.float64)
+    zeros = np.zeros((frames.shape[0], 1))
+    total = np.concatenate([zeros, np.cumsum(frames, axis=1)], axis=1)
+    squares = np.concatenate([zeros, np.cumsum(frames**2, axis=1)], axis=1)
+
+    counts = ends - starts
+    mean = (total[:, ends] - total[:, starts]) / counts
+    variance = (squares[:, ends] - squares[:, starts]) / counts - mean**2
+    return mean.T, np.sqrt(np.maximum(variance, 0.0)).T
+
+
+def extract_window_features(
+    audio,
+    sr,
+    window_seconds,
+    hop_seconds,
+    n_mfcc=13,
+    n_chroma=12,
+    spectrogram=None,
+    hop_length=HOP_LENGTH,
+):
+    """
+    Feature vectors for overlapping fixed-length windows of one signal.
+
+    Every frame-level descriptor is computed once over the whole signal
+    (from the shared spectrogram) and then summarised per window with
+    cumulative sums, in the same layout as AudioProcessor.extract_features.
+    Tempo comes from the window's mean tempogram. Returns an
+    (n_windows, n_features) float32 matrix; window i starts at
+    i * hop_seconds.
+    """
+    if spectrogram is None:
+        spectrogram = compute_spectrogram(audio, sr, hop_length=hop_length)
+
+    mfcc = librosa.feature.mfcc(S=spectrogram["mel_db"], sr=sr, n_mfcc=n_mfcc)
+    chroma = librosa.feature.chroma_stft(
+        S=spectrogram["power"], sr=sr, n_chroma=n_chroma
+    )
+    magnitude = spectrogram["magnitude"]
+    centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+    rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr)
+    bandwidth = librosa.feature.spectral_bandwidth(S=magnitude, sr=sr)
+    zcr = librosa.feature.zero_crossing_rate(audio, hop_length=hop_length)
+    rms = librosa.feature.rms(y=audio, hop_length=hop_length)
+    tempogram = librosa.feature.tempogram(
+        onset_envelope=spectrogram["onset_envelope"], sr=sr, hop_length=hop_length
+    )
+
+    n_frames = min(m.shape[1] for m in (mfcc, chroma, centroid, zcr, rms, tempogram))
+    starts, ends = window_bounds(
+        n_frames,
+        max(1, int(round(window_seconds * sr / hop_length))),
+        max(1, int(round(hop_seconds * sr / hop_length))),
+    )
+
+    mfcc_mean, mfcc_std = window_stats(mfcc, starts, ends)
+    chroma_mean, _ = window_stats(chroma, starts, ends)
+    centroid_mean, centroid_std = window_stats(centroid, starts, ends)
+    others, _ = window_stats(np.vstack([rolloff, zcr, rms, bandwidth]), starts, ends)
+    tempogram_mean, _ = window_stats(tempogram, starts, ends)
+
+    try:
+        tempo = librosa.feature.tempo(
+            tg=tempogram_mean.T, sr=sr, hop_length=hop_length, aggregate=None
+        )
+    except Exception:
+        tempo = np.zeros(len(starts))
+
+    return np.column_stack(
+        [
+            mfcc_mean,
+            mfcc_std,
+            chroma_mean,
+            centroid_mean,
+            centroid_std,
+            others[:, 0],
+            others[:, 1],
+            tempo,
+            others[:, 2],
+            others[:, 3],
+        ]
+    ).astype(np.float32)
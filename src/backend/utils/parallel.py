@@ -0,0 +1,39 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+def _apply_chunk(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def parallel_map(func, items, workers=1, chunksize=8):
+    """
+    Apply func to every item, in a process pool when workers > 1.
+
+    Results are yielded lazily and in input order. Items are consumed from the
+    iterable only as results are drained, with at most two chunks per worker in
+    flight, so memory stays bounded for arbitrarily long inputs. func must be
+    picklable (a module-level function or a functools.partial of one) and
+    should handle its own errors.
+    """
+    items = iter(items)
+
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    chunksize = max(1, chunksize)
+    max_pending = 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            chunk = list(islice(items, chunksize))
+            if chunk:
+                pending.append(pool.submit(_apply_chunk, func, chunk))
+            if pending and (not chunk or len(pending) >= max_pending):
+                yield from pending.popleft().result()
+            if not chunk and not pending:
+                break
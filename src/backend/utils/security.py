@@ -46,4 +46,8 @@ def validate_file_content(content: bytes, expected_extensions: list) -> bool:
     if content[:4] == b"RIFF" and content[8:12] == b"WAVE":
         return True
 
+    # MPEG audio frame sync, for MP3s without an ID3 tag
+    if len(content) >= 2 and content[0] == 0xFF and content[1] & 0xE0 == 0xE0:
+        return True
+
     return False